@@ -23,6 +23,40 @@ def load_reviewers_module():
 reviewers = load_reviewers_module()
 
 
+@pytest.fixture(autouse=True)
+def _isolate_request_state(monkeypatch, tmp_path):
+    """Reset process-wide request state so tests cannot leak into each other."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "user-cache"))
+    for var in ("HTTPS_PROXY", "https_proxy", "HTTP_PROXY", "http_proxy"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(reviewers, "_transport", None)
+    monkeypatch.setattr(reviewers, "_coordinator", None)
+    monkeypatch.setattr(reviewers, "_request_timeout", reviewers.REQUEST_TIMEOUT)
+    monkeypatch.setattr(reviewers, "_response_cache", None)
+    monkeypatch.setattr(reviewers, "_concurrency", reviewers._AdaptiveLimiter())
+    monkeypatch.setattr(reviewers, "_breaker", reviewers._CircuitBreaker())
+    monkeypatch.setattr(reviewers, "_hedger", reviewers._Hedger())
+    monkeypatch.setattr(reviewers, "_count_strategy", "grid")
+    monkeypatch.setattr(reviewers, "_review_source", "search")
+    monkeypatch.setattr(reviewers, "_discovery_pruning", False)
+    monkeypatch.setattr(reviewers, "_single_flight", reviewers._SingleFlight())
+    monkeypatch.setattr(
+        reviewers, "_count_packer", reviewers._AliasPacker(reviewers.COUNT_BATCH_SIZE)
+    )
+    monkeypatch.setattr(
+        reviewers, "_avatar_packer", reviewers._AliasPacker(reviewers.AVATAR_BATCH_SIZE)
+    )
+    state = reviewers._RateLimitState()
+    monkeypatch.setattr(reviewers, "_rate_limit", state)
+    monkeypatch.setattr(reviewers, "_pacer", reviewers._QuotaPacer(state))
+    yield
+    reviewers._hedger.close()
+    # A spinner left running would call the patched time.sleep of later tests.
+    reviewers.progress.stop()
+    if reviewers.progress._thread is not None:
+        reviewers.progress._thread.join()
+
+
 @pytest.fixture
 def mod():
     """Provide access to the reviewers module."""
@@ -166,3 +166,8 @@ def test_rank_numbers_update_on_period_change(page, live_server):
     assert texts[0] == "carol"
     ranks = page.locator(".reviewer-rank")
     assert [ranks.nth(i).text_content() for i in range(ranks.count())] == ["#1", "#2"]
+
+
+def test_review_counts_note_hidden_for_search_counts(page, live_server):
+    page.goto(live_server)
+    expect(page.locator("#review-counts-note")).to_be_hidden()
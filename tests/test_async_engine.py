@@ -0,0 +1,539 @@
+# tests/test_async_engine.py
+"""The asyncio engine must produce exactly the same results as the threads."""
+
+import asyncio
+import json
+import re
+import threading
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from conftest import reviewers
+
+MONTHS = [
+    ("2024-01", "2024-01-01", "2024-01-31"),
+    ("2024-02", "2024-02-01", "2024-02-29"),
+    ("2024-03", "2024-03-01", "2024-03-31"),
+]
+LOGINS = ["alice", "bob", "carol"]
+COUNT_ALIAS = re.compile(r'(\w+): search\(query: "([^"]*)"')
+USER_ALIAS = re.compile(r'(\w+): user\(login: "([^"]*)"\)')
+CONTRIBUTION_ALIAS = re.compile(
+    r'(y\d{4}): contributionsCollection\(from: "(\d{4}-\d{2})'
+)
+
+
+def fake_graphql(query, variables=None, allow_partial=False):
+    """Deterministic stand-in for _graphql_request covering every query shape."""
+    if "contributionsCollection" in query:
+        return _fake_contributions(query)
+    if variables and "q" in variables:
+        month = re.search(r"created:(\d{4}-\d{2})", variables["q"]).group(1)
+        page = int(variables.get("cursor") or 0)
+        people = ["alice", "bob", "carol", "dave", "renovate[bot]"]
+        nodes = [
+            {
+                "createdAt": f"{month}-1{i}T00:00:00Z",
+                "author": {"login": people[(page + i) % 5]},
+                "mergedBy": {"login": people[(page + 2 * i) % 4]} if i % 2 else None,
+                "participants": {
+                    "totalCount": 2,
+                    "nodes": [{"login": people[(page + i + j) % 5]} for j in (0, 3)],
+                },
+            }
+            for i in range(4)
+        ]
+        return {
+            "search": {
+                "pageInfo": {"hasNextPage": page < 1, "endCursor": str(page + 1)},
+                "nodes": nodes,
+            }
+        }
+    data = {"rateLimit": {"remaining": 4000, "resetAt": ""}}
+    if variables and "owner" in variables:
+        data["repository"] = {
+            "createdAt": "2024-01-05T00:00:00Z",
+            "pullRequests": {
+                "totalCount": 40,
+                "nodes": [{"updatedAt": "2024-03-20T00:00:00Z"}],
+            },
+            "mergedPRs": {"totalCount": 20},
+        }
+    for alias, login in USER_ALIAS.findall(query):
+        if login != "carol":
+            data[alias] = {"login": login, "avatarUrl": f"https://a/{login}"}
+    for alias, search_q in COUNT_ALIAS.findall(query):
+        data[alias] = {"issueCount": zlib.crc32(search_q.encode()) % 4}
+    return data
+
+
+def _fake_contributions(query):
+    """Give each reviewer a few reviewed PRs in the first month of each year.
+
+    erin reviews in so many other repositories that o/r is never listed.
+    """
+    login = re.search(r'user\(login: "([^"]*)"\)', query).group(1)
+    user = {}
+    for alias, month in CONTRIBUTION_ALIAS.findall(query):
+        if login == "erin":
+            repos = re.search(rf"{alias}:.*?maxRepositories: (\d+)", query, re.S)
+            user[alias] = {
+                "restrictedContributionsCount": 0,
+                "pullRequestReviewContributionsByRepository": [
+                    {"repository": {"nameWithOwner": f"o/other{i}"}}
+                    for i in range(int(repos.group(1)))
+                ],
+            }
+            continue
+        nodes = [
+            {
+                "pullRequest": {
+                    "number": f"{login}-{month}-{i}",
+                    "createdAt": f"{month}-0{i + 1}T00:00:00Z",
+                    "author": {"login": "dave"},
+                },
+            }
+            for i in range(zlib.crc32(login.encode()) % 3 + 1)
+        ]
+        user[alias] = {
+            "restrictedContributionsCount": len(login) % 2,
+            "pullRequestReviewContributionsByRepository": [
+                {
+                    "repository": {"nameWithOwner": "o/r"},
+                    "contributions": {
+                        "pageInfo": {"hasNextPage": False, "endCursor": None},
+                        "nodes": nodes,
+                    },
+                }
+            ],
+        }
+    return {"rateLimit": {"remaining": 4000, "resetAt": ""}, "user": user}
+
+
+@pytest.fixture
+def engine():
+    eng = reviewers._AsyncEngine(max_workers=4)
+    yield eng
+    eng.close()
+
+
+@pytest.fixture
+def fake_api(mock_graphql):
+    mock_graphql.side_effect = fake_graphql
+    return mock_graphql
+
+
+@patch("time.sleep")
+def test_discovery_matches(mock_sleep, fake_api, engine):
+    threaded_merges, asyncio_merges = {}, {}
+    threaded = reviewers.discover_reviewers(
+        "o", "r", 3, "2024-01", merges=threaded_merges
+    )
+    # A fresh single-flight, or every search would be answered from the first run.
+    reviewers._single_flight = reviewers._SingleFlight()
+    asyncio_result = reviewers.discover_reviewers(
+        "o", "r", 3, "2024-01", engine=engine, merges=asyncio_merges
+    )
+    assert asyncio_result == threaded
+    assert asyncio_merges == threaded_merges
+
+
+@patch("time.sleep")
+def test_discovery_coroutine_without_state(mock_sleep, fake_api, engine):
+    """Called directly with no discovery state, the coroutine starts afresh."""
+    threaded = reviewers.discover_reviewers("o", "r", 3, "2024-01")
+    reviewers._single_flight = reviewers._SingleFlight()
+    result = engine.run(
+        reviewers._discover_reviewers_async(engine, "o", "r", 3, "2024-01", merges={})
+    )
+    assert result == threaded
+
+
+@patch("time.sleep")
+def test_discovery_coroutine_without_merges(mock_sleep, fake_api, engine):
+    """Without a merges dict to fill, the scan's merge tallies are dropped."""
+    threaded = reviewers.discover_reviewers("o", "r", 3, "2024-01")
+    reviewers._single_flight = reviewers._SingleFlight()
+    state = {}
+    result = engine.run(
+        reviewers._discover_reviewers_async(engine, "o", "r", 3, "2024-01", state=state)
+    )
+    assert result == threaded
+    assert state["end_month"]
+
+
+@patch("time.sleep")
+def test_discovery_without_start_month(mock_sleep, fake_api, engine):
+    result = reviewers.discover_reviewers("o", "r", 2, engine=engine)
+    assert result == reviewers.discover_reviewers("o", "r", 2)
+
+
+@patch("time.sleep")
+def test_discovery_no_candidates(mock_sleep, mock_graphql, engine):
+    mock_graphql.return_value = {
+        "search": {"pageInfo": {"hasNextPage": False}, "nodes": []}
+    }
+    assert reviewers.discover_reviewers("o", "r", 5, "2024-01", engine=engine) == []
+
+
+@patch("time.sleep")
+def test_avatars_match(mock_sleep, fake_api, engine):
+    logins = [f"user{i}" for i in range(20)] + ["carol"]
+    threaded = reviewers.fetch_avatars(logins)
+    assert engine.run(reviewers._fetch_avatars_async(engine, logins)) == threaded
+    assert threaded["carol"] == "https://github.com/carol.png"
+
+
+@patch("time.sleep")
+def test_monthly_counts_match(mock_sleep, fake_api, engine):
+    logins = LOGINS + [f"user{i}" for i in range(10)]
+    threaded = reviewers.fetch_monthly_counts("o", "r", logins, MONTHS)
+    planner = reviewers._QueryPlanner()
+    result = reviewers.fetch_monthly_counts("o", "r", logins, MONTHS, planner)
+    engine.run(planner.run_async(engine))
+    assert result == threaded
+
+
+@patch("time.sleep")
+def test_scanned_monthly_counts_match(mock_sleep, fake_api, engine):
+    months = reviewers.generate_month_ranges("2020-01", "2024-03")
+    logins = ["alice", "bob"]
+    totals = {("alice", "review"): 8, ("bob", "comment"): 8}
+    threaded = reviewers.fetch_monthly_counts("o", "r", logins, months, totals=totals)
+    planner = reviewers._QueryPlanner()
+    result = reviewers.fetch_monthly_counts("o", "r", logins, months, planner, totals)
+    engine.run(planner.run_async(engine))
+    assert result == threaded
+    # Two pages of four PRs, all created in the scan's first month.
+    assert threaded[0]["alice"]["2020-01"] == 8
+
+
+@patch("time.sleep")
+def test_merge_counts_match(mock_sleep, fake_api, engine):
+    threaded = reviewers.fetch_merge_counts("o", "r", LOGINS, MONTHS)
+    result = engine.run(
+        reviewers._fetch_merge_counts_async(engine, "o", "r", LOGINS, MONTHS)
+    )
+    assert result == threaded
+    assert any(threaded[login] for login in LOGINS)
+
+
+def crowded_february(query, variables=None, allow_partial=False):
+    """fake_graphql, with February reporting too many PRs above a week."""
+    data = fake_graphql(query, variables, allow_partial)
+    if variables and "q" in variables:
+        start, end = re.search(r"created:(\S+)\.\.(\S+)", variables["q"]).groups()
+        wide = (int(end[-2:]) - int(start[-2:])) >= 7
+        data["search"]["issueCount"] = 1500 if start[:7] == "2024-02" and wide else 8
+    return data
+
+
+@patch("time.sleep")
+def test_merge_counts_split_month_match(mock_sleep, mock_graphql, engine):
+    mock_graphql.side_effect = crowded_february
+    threaded = reviewers.fetch_merge_counts("o", "r", LOGINS, MONTHS)
+    threaded_calls = mock_graphql.call_count
+    result = engine.run(
+        reviewers._fetch_merge_counts_async(engine, "o", "r", LOGINS, MONTHS)
+    )
+    assert result == threaded
+    assert mock_graphql.call_count == 2 * threaded_calls
+    # February: the month and its two halves split after one page each,
+    # then five week-or-shorter pieces are paged twice.
+    feb = [c for c in mock_graphql.call_args_list if "2024-02" in c.args[1]["q"]]
+    assert len(feb) == 2 * (3 + 5 * 2)
+
+
+@patch("time.sleep")
+def test_late_activity_months_match(mock_sleep, mock_graphql, engine):
+    mock_graphql.side_effect = crowded_february
+    since = "2024-04-01T00:00:00Z"
+    months = MONTHS[1:]  # the span starts in crowded February, so it splits
+    threaded = reviewers.fetch_late_activity_months("o", "r", since, months)
+    result = engine.run(
+        reviewers._fetch_late_activity_months_async(engine, "o", "r", since, months)
+    )
+    assert result == threaded == {"2024-02", "2024-03"}
+    empty = reviewers._fetch_late_activity_months_async(engine, "o", "r", since, [])
+    assert engine.run(empty) == set()
+
+
+@patch("time.sleep")
+def test_merge_counts_truncation_warning(mock_sleep, mock_graphql, engine):
+    mock_graphql.return_value = {
+        "search": {"pageInfo": {"hasNextPage": True, "endCursor": "c"}, "nodes": []}
+    }
+    engine.run(
+        reviewers._fetch_merge_counts_async(engine, "o", "r", LOGINS, MONTHS[:1])
+    )
+    assert mock_graphql.call_count == 10
+
+
+@patch("time.sleep")
+def test_period_counts_match(mock_sleep, fake_api, engine):
+    logins = LOGINS + [f"user{i}" for i in range(10)]
+    threaded = reviewers.fetch_reviewer_period_counts("o", "r", logins)
+    planner = reviewers._QueryPlanner()
+    result = reviewers.fetch_reviewer_period_counts("o", "r", logins, planner)
+    engine.run(planner.run_async(engine))
+    assert result == threaded
+
+
+@patch("time.sleep")
+def test_review_contributions_match(mock_sleep, fake_api, engine):
+    """Including a reviewer busy in too many repositories, searched instead."""
+    logins = ["alice", "erin"]
+    threaded = reviewers.fetch_review_contributions("o", "r", logins, MONTHS)
+    reviewers._single_flight = reviewers._SingleFlight()
+    result = engine.run(
+        reviewers._fetch_review_contributions_async(engine, "o", "r", logins, MONTHS)
+    )
+    assert result == threaded
+    queries = [call.args[0] for call in fake_api.call_args_list]
+    assert any("reviewed-by:erin" in query for query in queries)
+    assert not any("reviewed-by:alice" in query for query in queries)
+
+
+@patch("time.sleep")
+@patch.object(reviewers, "_scrape_search_count")
+def test_scrape_fallback_matches(mock_scrape, mock_sleep, engine, monkeypatch):
+    monkeypatch.setattr(reviewers, "SCRAPE_MAX_RPS", 10_000)
+    mock_scrape.side_effect = lambda url: len(url) % 3
+    periods = reviewers._build_period_date_filters()
+    logins = [f"user{i}" for i in range(30)]
+
+    threaded = {login: {} for login in logins}
+    reviewers._scrape_fallback_period_counts("o", "r", logins, threaded, periods)
+    result = {login: {} for login in logins}
+    reviewers._scrape_fallback_period_counts(
+        "o", "r", logins, result, periods, engine=engine
+    )
+    assert result == threaded
+
+
+def test_scrape_paces_requests(engine, monkeypatch):
+    """Back-to-back scrapes are spaced by 1 / SCRAPE_MAX_RPS on the loop."""
+    monkeypatch.setattr(reviewers, "SCRAPE_MAX_RPS", 50)
+    # A frozen loop clock, so the second scrape is always a full slot away.
+    monkeypatch.setattr(engine._loop, "time", lambda: 100.0)
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    with (
+        patch.object(reviewers, "_scrape_search_count", return_value=1),
+        patch.object(reviewers.asyncio, "sleep", fake_sleep),
+    ):
+        counts = engine.run(
+            reviewers._gather_or_cancel(engine.scrape("u1"), engine.scrape("u2"))
+        )
+    assert counts == [1, 1]
+    assert sleeps == [pytest.approx(0.02)]
+
+
+def test_gather_or_cancel_cancels_siblings(engine):
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        engine.run(reviewers._gather_or_cancel(slow(), fail()))
+    engine.run(asyncio.sleep(0))
+    assert cancelled == [True]
+
+
+def test_run_phases_both_engines(engine):
+    def double(x):
+        return 2 * x
+
+    async def double_async(eng, x):
+        return await eng.call(double, x)
+
+    phases = {"a": (double, double_async, (1,)), "b": (double, double_async, (5,))}
+    assert reviewers._run_phases(phases) == {"a": 2, "b": 10}
+    assert reviewers._run_phases(phases, engine) == {"a": 2, "b": 10}
+
+
+@patch("time.sleep")
+@patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
+@patch.object(reviewers, "webbrowser")
+def test_main_engines_produce_identical_cache(
+    mock_wb, mock_rl, mock_sleep, fake_api, tmp_path
+):
+    """A fresh run followed by an incremental run matches across engines."""
+    caches = _fresh_then_incremental(tmp_path, [])
+    assert caches["asyncio"] == caches["threads"]
+    assert caches["threads"]["reviewers"]
+
+
+@patch("time.sleep")
+@patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
+@patch.object(reviewers, "webbrowser")
+def test_main_engines_match_with_review_contributions(
+    mock_wb, mock_rl, mock_sleep, fake_api, tmp_path
+):
+    caches = _fresh_then_incremental(tmp_path, ["--review-source", "contributions"])
+    assert caches["asyncio"] == caches["threads"]
+    check = caches["threads"]["review_counts"]["reconciliation"]
+    assert check["sampled"] > 0
+    assert any(r["monthly"] for r in caches["threads"]["reviewers"].values())
+
+
+def _fresh_then_incremental(tmp_path, extra_args):
+    """Return {engine name: data.json} after a fresh and an incremental run."""
+    from datetime import datetime as real_datetime
+    from datetime import timezone
+
+    caches = {}
+    for name in ("threads", "asyncio"):
+        out = tmp_path / name
+        argv = ["--output", str(out), "--transport", "gh", "--engine", name, "o/r"]
+        argv += extra_args
+        with patch.object(reviewers, "datetime") as mock_dt:
+            mock_dt.now.return_value = real_datetime(2024, 3, 20, tzinfo=timezone.utc)
+            mock_dt.fromtimestamp = real_datetime.fromtimestamp
+            reviewers.main(argv + ["--no-open"])
+            first = json.loads((out / "o" / "r" / "data.json").read_text())
+            # Force the incremental path past the activity check.
+            first["activity"]["last_pr_updated_at"] = "2024-01-01T00:00:00Z"
+            first["activity"]["repo_totals"]["all"]["merged"] = -1
+            first["activity"]["total_pr_count"] = 0
+            first["end_month"] = "2024-02"
+            (out / "o" / "r" / "data.json").write_text(json.dumps(first))
+            reviewers.main(argv + ["--no-open"])
+        caches[name] = json.loads((out / "o" / "r" / "data.json").read_text())
+    return caches
+
+
+# --- hedged count requests ---
+
+
+def test_count_unhedged_by_default(mock_graphql, engine):
+    mock_graphql.return_value = {"ok": True}
+    assert engine.run(engine.count("query { }")) == {"ok": True}
+    assert reviewers._hedger.requests == 0
+
+
+def test_count_hedges_slow_request(mock_graphql, engine):
+    release = threading.Event()
+    calls = []
+
+    def graphql(query, allow_partial=False):
+        calls.append(query)
+        if len(calls) == 1:
+            release.wait(5)
+            return {"slow": True}
+        return {"fast": True}
+
+    mock_graphql.side_effect = graphql
+    hedger = reviewers._hedger
+    hedger.enabled, hedger.budget = True, 1.0
+    hedger._latencies.extend([0.01] * hedger.min_samples)
+    try:
+        assert engine.run(engine.count("query { }")) == {"fast": True}
+    finally:
+        release.set()
+    assert (hedger.sent, hedger.wins) == (1, 1)
+
+
+def test_count_hedge_failure_uses_original(mock_graphql, engine):
+    release = threading.Event()
+    calls = []
+
+    def graphql(query, allow_partial=False):
+        calls.append(query)
+        if len(calls) == 1:
+            release.wait(5)
+            return {"primary": True}
+        release.set()
+        raise RuntimeError("hedge failed")
+
+    mock_graphql.side_effect = graphql
+    hedger = reviewers._hedger
+    hedger.enabled, hedger.budget = True, 1.0
+    hedger._latencies.extend([0.01] * hedger.min_samples)
+    assert engine.run(engine.count("query { }")) == {"primary": True}
+    assert hedger.wins == 0
+
+
+def test_count_raises_original_error(mock_graphql, engine):
+    mock_graphql.side_effect = RuntimeError("boom")
+    reviewers._hedger.enabled = True
+    with pytest.raises(RuntimeError, match="boom"):
+        engine.run(engine.count("query { }"))
+
+
+def test_count_borrows_in_flight_alias(mock_graphql, engine):
+    """Concurrent batches on the loop share an alias's single request."""
+    query = reviewers._count_query([("q0", "shared")])
+
+    def graphql(q, allow_partial=False):
+        threading.Event().wait(0.05)
+        return {"q0": {"issueCount": 4}}
+
+    mock_graphql.side_effect = graphql
+
+    async def both():
+        return await asyncio.gather(engine.count(query), engine.count(query))
+
+    assert engine.run(both()) == [{"q0": {"issueCount": 4}}] * 2
+    mock_graphql.assert_called_once()
+    assert reviewers._single_flight.saved == 1
+
+
+def test_run_batches_async_splits_after_server_error():
+    sent = []
+
+    async def send(chunk):
+        sent.append(len(chunk))
+        if len(chunk) > 2:
+            raise RuntimeError("HTTP 503: Service Unavailable")
+        return {key: 1 for key, _ in chunk}, [], {}
+
+    async def collect():
+        tasks = [(i, str(i)) for i in range(4)]
+        packer = reviewers._AliasPacker(4)
+        return [r async for r, _ in reviewers._run_batches_async(tasks, packer, send)]
+
+    loop = asyncio.new_event_loop()
+    results = loop.run_until_complete(collect())
+    loop.close()
+    assert sum(len(r) for r in results) == 4
+    assert sent == [4, 2, 2]
+
+
+def test_run_batches_async_cancels_on_failure():
+    cancelled = []
+
+    async def send(chunk):
+        if chunk[0][0] == 0:
+            raise RuntimeError("HTTP 401: Unauthorized")
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(chunk)
+            raise
+
+    async def collect():
+        tasks = [(i, str(i)) for i in range(3)]
+        packer = reviewers._AliasPacker(1)
+        async for _ in reviewers._run_batches_async(tasks, packer, send):
+            pass
+
+    loop = asyncio.new_event_loop()
+    with pytest.raises(RuntimeError, match="401"):
+        loop.run_until_complete(collect())
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+    assert len(cancelled) == 2
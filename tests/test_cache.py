@@ -1,5 +1,10 @@
 # tests/test_cache.py
+import json
 import os
+import time
+from unittest.mock import patch
+
+import pytest
 
 from conftest import reviewers
 
@@ -195,3 +200,220 @@ def test_cache_v8_without_activity_loads_normally(tmp_path):
     assert loaded.get("version") == 8
     assert loaded.get("activity") is None
     assert "alice" in loaded["reviewers"]
+
+
+# --- GraphQL response cache ---
+
+SEALED = 'q0: search(query: "repo:o/r created:2020-01-01..2020-01-31") { issueCount }'
+OPEN = 'q0: search(query: "repo:o/r created:2999-01-01..2999-01-31") { issueCount }'
+PERIOD = 'q0: search(query: "repo:o/r updated:>=2024-01-01") { issueCount }'
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    return reviewers.configure_response_cache(str(tmp_path / "responses"))
+
+
+def test_response_cache_lifetimes():
+    lifetime = reviewers._ResponseCache.lifetime
+    assert lifetime(SEALED) is None
+    assert lifetime(OPEN) == 0
+    assert lifetime(PERIOD) == reviewers.PERIOD_CACHE_TTL
+    assert lifetime("query { repository { createdAt } }") == 0
+    sealed_vars = {"q": "created:2020-01-01..2020-01-31"}
+    assert lifetime("query($q: String!) {}", sealed_vars) is None
+    # One open range in a batch keeps the whole batch live.
+    assert lifetime(SEALED + OPEN) == 0
+    # "Changed since the last run" is never answered from the cache.
+    changed = "repo:o/r is:pr updated:>=2024-01-05T10:00:00+00:00"
+    assert lifetime(f'q0: search(query: "{changed}") {{ issueCount }}') == 0
+    # The late-activity scan, even over sealed months.
+    assert lifetime(SEALED.replace("repo:o/r", changed)) == 0
+
+
+def test_response_cache_key_normalizes(response_cache):
+    a = response_cache._path("query {\n  a\n}", {"q": "x", "cursor": None})
+    assert a == response_cache._path("query { a }", {"q": "x"})
+    assert a != response_cache._path("query { a }", {"q": "y"})
+
+
+def test_sealed_response_served_without_request(response_cache, mock_fetch):
+    mock_fetch.return_value = {"q0": {"issueCount": 3}}
+    assert reviewers._graphql_request(SEALED) == {"q0": {"issueCount": 3}}
+    assert reviewers._graphql_request(SEALED) == {"q0": {"issueCount": 3}}
+    mock_fetch.assert_called_once()
+    assert response_cache.hits == 1
+
+
+def test_open_response_always_refetched(response_cache, mock_fetch):
+    mock_fetch.return_value = {"q0": {"issueCount": 3}}
+    reviewers._graphql_request(OPEN)
+    reviewers._graphql_request(OPEN)
+    assert mock_fetch.call_count == 2
+
+
+def test_period_response_expires(response_cache, mock_fetch):
+    mock_fetch.return_value = {"q0": {"issueCount": 3}}
+    reviewers._graphql_request(PERIOD)
+    reviewers._graphql_request(PERIOD)
+    assert mock_fetch.call_count == 1
+    later = time.time() + reviewers.PERIOD_CACHE_TTL + 1
+    with patch("time.time", return_value=later):
+        reviewers._graphql_request(PERIOD)
+    assert mock_fetch.call_count == 2
+
+
+def test_corrupt_entry_is_a_miss(response_cache, mock_fetch):
+    mock_fetch.return_value = {"ok": True}
+    path = response_cache._path(SEALED, None)
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        f.write("{not json")
+    assert reviewers._graphql_request(SEALED) == {"ok": True}
+    with open(path) as f:
+        assert json.load(f)["data"] == {"ok": True}
+
+
+def test_partial_response_not_served_fresh(response_cache, mock_fetch):
+    """A response with a null alias is kept for --offline but refetched."""
+    mock_fetch.return_value = {"q0": None}
+    reviewers._graphql_request(SEALED)
+    reviewers._graphql_request(SEALED)
+    assert mock_fetch.call_count == 2
+
+
+def test_refresh_refetches_sealed_responses(tmp_path, mock_fetch):
+    """--refresh re-requests primed sealed entries and stores the answers."""
+    directory = str(tmp_path / "responses")
+    mock_fetch.return_value = {"q0": {"issueCount": 3}}
+    reviewers.configure_response_cache(directory)
+    reviewers._graphql_request(SEALED)
+    reviewers.configure_response_cache(directory, refresh=True)
+    mock_fetch.return_value = {"q0": {"issueCount": 4}}
+    assert reviewers._graphql_request(SEALED) == {"q0": {"issueCount": 4}}
+    assert reviewers._graphql_request(SEALED) == {"q0": {"issueCount": 4}}
+    assert mock_fetch.call_count == 2
+    # The next run without --refresh is served the fresh answer.
+    reviewers.configure_response_cache(directory)
+    assert reviewers._graphql_request(SEALED) == {"q0": {"issueCount": 4}}
+    assert mock_fetch.call_count == 2
+
+
+def test_late_month_refetched_once(tmp_path, mock_fetch):
+    """A sealed month with late activity is re-fetched, not replayed."""
+    directory = str(tmp_path / "responses")
+    mock_fetch.return_value = {"q0": {"issueCount": 3}}
+    reviewers.configure_response_cache(directory)
+    reviewers._graphql_request(SEALED)
+    # The next run finds late activity in January 2020.
+    cache = reviewers.configure_response_cache(directory)
+    cache.refetch({"2019-12", "2020-02"})
+    reviewers._graphql_request(SEALED)
+    assert mock_fetch.call_count == 1
+    cache.refetch({"2020-01"})
+    mock_fetch.return_value = {"q0": {"issueCount": 4}}
+    assert reviewers._graphql_request(SEALED) == {"q0": {"issueCount": 4}}
+    # The fresh answer is served for the rest of the run.
+    assert reviewers._graphql_request(SEALED) == {"q0": {"issueCount": 4}}
+    assert mock_fetch.call_count == 2
+    # A range spanning the month counts too; --offline still serves it.
+    spanning = SEALED.replace("2020-01-01..2020-01-31", "2019-07-01..2020-06-30")
+    cache.put(spanning, None, {"q0": {"issueCount": 9}})
+    other = reviewers.configure_response_cache(directory)
+    other.refetch({"2020-01"})
+    assert other.get(spanning) is None
+    offline = reviewers.configure_response_cache(directory, offline=True)
+    offline.refetch({"2020-01"})
+    assert offline.get(spanning) == {"q0": {"issueCount": 9}}
+
+
+def _month_counts(*months):
+    """A count batch whose searches each count their month's number."""
+    return reviewers._count_query(
+        (f"q{i}", f"repo:o/r created:2020-{m:02d}-01..2020-{m:02d}-28")
+        for i, m in enumerate(months)
+    )
+
+
+def test_batched_aliases_cached_one_by_one(tmp_path, mock_fetch):
+    """Batches packed differently still hit, and only misses are sent."""
+    mock_fetch.side_effect = lambda query, variables=None, allow_partial=False: {
+        "rateLimit": {"remaining": 4999},
+        **{
+            alias: {"issueCount": int(search[-5:-3])}
+            for alias, search in reviewers._COUNT_ALIAS.findall(query)
+        },
+    }
+    directory = str(tmp_path / "responses")
+    reviewers.configure_response_cache(directory)
+    reviewers._graphql_request(_month_counts(1, 2))
+    data = reviewers._graphql_request(_month_counts(2, 3))
+    assert data.pop("rateLimit") == {"remaining": 4999}
+    assert data == {"q0": {"issueCount": 2}, "q1": {"issueCount": 3}}
+    assert reviewers._COUNT_ALIAS.findall(mock_fetch.call_args.args[0]) == [
+        ("q1", "repo:o/r created:2020-03-01..2020-03-28")
+    ]
+    # Only queries made of alias lines are split.
+    head = reviewers._BATCH_QUERY_HEAD
+    assert reviewers._batch_aliases(head + "q0: a\n  { b }\n}") is None
+    reviewers.configure_response_cache(directory, offline=True)
+    data = reviewers._graphql_request(_month_counts(3, 1, 2))
+    assert [data[f"q{i}"]["issueCount"] for i in range(3)] == [3, 1, 2]
+    assert mock_fetch.call_count == 2
+
+
+def test_response_cache_evicts_unused_then_least_recent(response_cache, mock_fetch):
+    """Old entries go first, then the least recently served, down to the cap."""
+    queries = [SEALED.replace("o/r", f"o/r{i}") for i in range(4)]
+    for i, query in enumerate(queries):
+        mock_fetch.return_value = {"q0": {"issueCount": i}}
+        reviewers._graphql_request(query)
+    paths = [response_cache._path(query, None) for query in queries]
+    now = time.time()
+    ages = [100 * 86400, 3 * 3600, 2 * 3600, 1 * 3600]
+    for path, age in zip(paths, ages):
+        os.utime(path, (now - age, now - age))
+    reviewers._graphql_request(queries[1])  # served, so used most recently
+    size = os.path.getsize(paths[1])
+    assert response_cache.evict(max_bytes=2 * size, max_age=90 * 86400) == 2
+    assert [os.path.exists(path) for path in paths] == [False, True, False, True]
+    assert response_cache.evict(max_bytes=2 * size, max_age=90 * 86400) == 0
+
+
+def test_response_cache_tolerates_concurrent_eviction(response_cache, mock_fetch):
+    """Entries deleted by another run mid-way are skipped, not errors."""
+    mock_fetch.return_value = {"q0": {"issueCount": 1}}
+    reviewers._graphql_request(SEALED)
+    with patch("os.utime", side_effect=FileNotFoundError):
+        assert reviewers._graphql_request(SEALED) == {"q0": {"issueCount": 1}}
+    with patch("os.stat", side_effect=FileNotFoundError):
+        assert response_cache.evict(max_bytes=0) == 0
+    with patch("os.remove", side_effect=FileNotFoundError):
+        assert response_cache.evict(max_bytes=0) == 0
+    assert response_cache.evict(max_bytes=0) == 1
+
+
+def test_offline_serves_expired_entries(tmp_path, mock_fetch):
+    mock_fetch.return_value = {"ok": True}
+    directory = str(tmp_path / "responses")
+    reviewers.configure_response_cache(directory)
+    reviewers._graphql_request(OPEN)
+    reviewers.configure_response_cache(directory, offline=True)
+    assert reviewers._graphql_request(OPEN) == {"ok": True}
+    mock_fetch.assert_called_once()
+    with pytest.raises(RuntimeError, match="--offline"):
+        reviewers._graphql_request(SEALED)
+
+
+def test_offline_skips_budget_check(tmp_path, capsys):
+    reviewers.configure_response_cache(str(tmp_path), offline=True)
+    with patch.object(reviewers, "get_rate_limit_info") as mock_info:
+        reviewers.check_rate_limit_budget(100)
+    mock_info.assert_not_called()
+    assert capsys.readouterr().out == ""
+
+
+@pytest.fixture
+def mock_fetch():
+    with patch.object(reviewers, "_fetch_graphql") as mock:
+        yield mock
@@ -37,3 +37,65 @@ def test_exclude_parsing():
     """--exclude accepts comma-separated logins."""
     args = reviewers.parse_args(["owner/repo", "--exclude", "bot1,bot2"])
     assert args.exclude == "bot1,bot2"
+
+
+def test_transport_default():
+    args = reviewers.parse_args(["owner/repo"])
+    assert args.transport == "auto"
+
+
+def test_transport_choice():
+    args = reviewers.parse_args(["owner/repo", "--transport", "gh"])
+    assert args.transport == "gh"
+
+
+def test_request_timeout_default():
+    args = reviewers.parse_args(["owner/repo"])
+    assert args.request_timeout == reviewers.REQUEST_TIMEOUT
+    assert args.hedge is False
+
+
+def test_request_timeout_custom():
+    args = reviewers.parse_args(["owner/repo", "--request-timeout", "15", "--hedge"])
+    assert args.request_timeout == 15
+    assert args.hedge is True
+
+
+def test_request_timeout_must_be_positive():
+    with pytest.raises(SystemExit):
+        reviewers.parse_args(["owner/repo", "--request-timeout", "0"])
+
+
+def test_offline_flag():
+    assert reviewers.parse_args(["owner/repo"]).offline is False
+    assert reviewers.parse_args(["owner/repo", "--offline"]).offline is True
+
+
+def test_prune_flag():
+    assert reviewers.parse_args(["owner/repo"]).prune is False
+    assert reviewers.parse_args(["owner/repo", "--prune"]).prune is True
+
+
+def test_credential_repeatable():
+    assert reviewers.parse_args(["owner/repo"]).credential == []
+    args = reviewers.parse_args(
+        ["owner/repo", "--credential", "gh", "--credential", "env:APP_TOKEN"]
+    )
+    assert args.credential == ["gh", "env:APP_TOKEN"]
+
+
+def test_no_wait_flag():
+    assert reviewers.parse_args(["owner/repo"]).no_wait is False
+    assert reviewers.parse_args(["owner/repo", "--no-wait"]).no_wait is True
+
+
+def test_count_strategy_flag():
+    assert reviewers.parse_args(["owner/repo"]).count_strategy == "grid"
+    args = reviewers.parse_args(["owner/repo", "--count-strategy", "bisect"])
+    assert args.count_strategy == "bisect"
+
+
+def test_review_source_flag():
+    assert reviewers.parse_args(["owner/repo"]).review_source == "search"
+    args = reviewers.parse_args(["owner/repo", "--review-source", "contributions"])
+    assert args.review_source == "contributions"
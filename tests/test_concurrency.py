@@ -0,0 +1,810 @@
+# tests/test_concurrency.py
+"""Tests for the AIMD limiter, hedging, single-flight, and adaptive packing."""
+
+import asyncio
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from conftest import reviewers
+
+
+# --- _AdaptiveLimiter ---
+
+
+def test_initial_limit_capped_by_maximum():
+    assert reviewers._AdaptiveLimiter(initial=10, maximum=4).limit == 4
+    assert reviewers._AdaptiveLimiter(initial=0, maximum=4).limit == 1
+
+
+def test_default_maximum_is_max_workers():
+    assert reviewers._AdaptiveLimiter().maximum == reviewers.MAX_WORKERS
+
+
+def test_additive_increase_one_per_window():
+    """The limit grows by about one per window of `limit` successes."""
+    limiter = reviewers._AdaptiveLimiter(initial=4, maximum=30)
+    for _ in range(4):
+        limiter.on_success()
+    assert limiter.limit == 4
+    limiter.on_success()
+    assert limiter.limit == 5
+
+
+def test_increase_stops_at_maximum():
+    limiter = reviewers._AdaptiveLimiter(initial=2, maximum=3)
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.limit == 3
+
+
+def test_throttle_halves_limit():
+    limiter = reviewers._AdaptiveLimiter(initial=16, maximum=30)
+    ticket = limiter.acquire()
+    limiter.release()
+    limiter.on_throttle(ticket)
+    assert limiter.limit == 8
+
+
+def test_throttle_burst_halves_once():
+    """Requests sent before the cut cannot cut the limit again."""
+    limiter = reviewers._AdaptiveLimiter(initial=16, maximum=30)
+    tickets = [limiter.acquire() for _ in range(5)]
+    for ticket in tickets:
+        limiter.release()
+        limiter.on_throttle(ticket)
+    assert limiter.limit == 8
+
+    # A request sent after the cut can cut it again.
+    ticket = limiter.acquire()
+    limiter.release()
+    limiter.on_throttle(ticket)
+    assert limiter.limit == 4
+
+
+def test_throttle_floor():
+    limiter = reviewers._AdaptiveLimiter(initial=1, maximum=30)
+    ticket = limiter.acquire()
+    limiter.release()
+    limiter.on_throttle(ticket)
+    assert limiter.limit == 1
+
+
+def test_acquire_blocks_at_limit():
+    limiter = reviewers._AdaptiveLimiter(initial=1, maximum=30)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def second():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release()
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_growth_wakes_waiters():
+    limiter = reviewers._AdaptiveLimiter(initial=1, maximum=30)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def second():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.on_success()
+    assert acquired.wait(5)
+    thread.join()
+
+
+# --- _graphql_request integration ---
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = reviewers._AdaptiveLimiter(initial=8, maximum=30)
+    monkeypatch.setattr(reviewers, "_concurrency", limiter)
+    return limiter
+
+
+@patch.object(reviewers, "_wait_for_rate_limit_reset")
+def test_http_403_cuts_limit(mock_wait, limiter):
+    responses = [
+        reviewers._TransportError("gh api graphql", "HTTP 403: Forbidden", ""),
+        {"data": {"ok": True}},
+    ]
+
+    def post(query, variables=None):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    with patch.object(reviewers, "_gh_graphql_post", side_effect=post):
+        assert reviewers._graphql_request("query { }") == {"ok": True}
+    assert limiter.limit == 4
+    mock_wait.assert_called_once()
+
+
+@patch("time.sleep")
+def test_secondary_limit_in_body_cuts_limit(mock_sleep, limiter):
+    responses = [
+        {"errors": [{"message": "You have exceeded a secondary rate limit."}]},
+        {"data": {"ok": True}},
+    ]
+    with patch.object(reviewers, "_gh_graphql_post", side_effect=responses):
+        assert reviewers._graphql_request("query { }") == {"ok": True}
+    assert limiter.limit == 4
+
+
+def test_other_errors_leave_limit(limiter):
+    error = reviewers._TransportError("gh api graphql", "HTTP 404: Not Found", "")
+    with patch.object(reviewers, "_gh_graphql_post", side_effect=error):
+        with pytest.raises(RuntimeError, match="404"):
+            reviewers._graphql_request("query { }")
+    assert limiter.limit == 8
+    assert limiter._in_flight == 0
+
+
+def test_in_flight_never_exceeds_limit(monkeypatch):
+    """Requests from many pools share the one limit."""
+    limiter = reviewers._AdaptiveLimiter(initial=3, maximum=3)
+    monkeypatch.setattr(reviewers, "_concurrency", limiter)
+    lock = threading.Lock()
+    state = {"now": 0, "peak": 0}
+    release = threading.Event()
+
+    def post(query, variables=None):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        release.wait(5)
+        with lock:
+            state["now"] -= 1
+        return {"data": {}}
+
+    with patch.object(reviewers, "_gh_graphql_post", side_effect=post):
+        with ThreadPoolExecutor(4) as a, ThreadPoolExecutor(4) as b:
+            futures = [
+                pool.submit(reviewers._graphql_request, "query { }")
+                for pool in (a, b)
+                for _ in range(4)
+            ]
+            threading.Event().wait(0.1)
+            release.set()
+            for future in futures:
+                future.result()
+    assert state["peak"] == 3
+
+
+# --- _Hedger ---
+
+
+def _learned_hedger(latency=1.0, **kwargs):
+    hedger = reviewers._Hedger(enabled=True, **kwargs)
+    hedger._latencies.extend([latency] * hedger.min_samples)
+    return hedger
+
+
+def test_hedger_disabled_passes_through(mock_graphql):
+    mock_graphql.return_value = {"ok": True}
+    hedger = reviewers._Hedger()
+    assert hedger.request("query { }") == {"ok": True}
+    assert hedger.requests == 0
+    assert hedger._executor is None
+
+
+def test_hedger_threshold_is_p95():
+    hedger = reviewers._Hedger(enabled=True)
+    assert hedger.threshold() is None
+    hedger._latencies.extend(float(i) for i in range(1, 101))
+    assert hedger.threshold() == 95.0
+
+
+def test_hedger_no_hedge_while_learning(mock_graphql):
+    mock_graphql.return_value = {"ok": True}
+    hedger = reviewers._Hedger(enabled=True)
+    for _ in range(3):
+        assert hedger.request("query { }") == {"ok": True}
+    assert mock_graphql.call_count == 3
+    assert hedger.sent == 0
+    assert len(hedger._latencies) == 3
+    hedger.close()
+
+
+def test_hedger_duplicate_wins_over_stuck_request(mock_graphql):
+    release = threading.Event()
+    calls = []
+
+    def graphql(query, allow_partial=False):
+        calls.append(query)
+        if len(calls) == 1:
+            release.wait(5)
+            return {"slow": True}
+        return {"fast": True}
+
+    mock_graphql.side_effect = graphql
+    hedger = _learned_hedger(latency=0.01, budget=1.0)
+    try:
+        assert hedger.request("query { }") == {"fast": True}
+    finally:
+        release.set()
+        hedger.close()
+    assert len(calls) == 2
+    assert (hedger.sent, hedger.wins) == (1, 1)
+    assert "Hedged 1 of 1 count batches (1 answered first" in hedger.summary()
+
+
+def test_hedger_budget_caps_hedges(mock_graphql):
+    def graphql(query, allow_partial=False):
+        threading.Event().wait(0.05)
+        return {"ok": True}
+
+    mock_graphql.side_effect = graphql
+    hedger = _learned_hedger(latency=0.001, budget=0.25)
+    hedger._latencies.extend([0.001] * 180)
+    for _ in range(8):
+        hedger.request("query { }")
+    hedger.close()
+    assert hedger.sent == 2
+    assert mock_graphql.call_count == 10
+
+
+def test_hedger_falls_back_when_hedge_fails(mock_graphql):
+    release = threading.Event()
+    calls = []
+
+    def graphql(query, allow_partial=False):
+        calls.append(query)
+        if len(calls) == 1:
+            release.wait(5)
+            return {"primary": True}
+        release.set()
+        raise RuntimeError("hedge failed")
+
+    mock_graphql.side_effect = graphql
+    hedger = _learned_hedger(latency=0.01, budget=1.0)
+    assert hedger.request("query { }") == {"primary": True}
+    hedger.close()
+    assert hedger.wins == 0
+
+
+def test_hedger_raises_original_error(mock_graphql):
+    mock_graphql.side_effect = RuntimeError("boom")
+    hedger = _learned_hedger(latency=0.01, budget=1.0)
+    with pytest.raises(RuntimeError, match="boom"):
+        hedger.request("query { }")
+    hedger.close()
+
+
+def test_hedger_summary_empty():
+    assert reviewers._Hedger().summary() == ""
+
+
+# --- _SingleFlight ---
+
+
+def _batch(*searches):
+    return reviewers._count_query((f"q{i}", q) for i, q in enumerate(searches))
+
+
+def _answer(query):
+    """Answer every alias with the length of its search string."""
+    data = {"rateLimit": {"remaining": 100}}
+    for alias, search in reviewers._COUNT_ALIAS.findall(query):
+        data[alias] = {"issueCount": len(search)}
+    return data
+
+
+def test_single_flight_reuses_recent_answers():
+    flight = reviewers._SingleFlight()
+    sent = []
+
+    def send(query):
+        sent.append(query)
+        return _answer(query)
+
+    first = flight.request(_batch("a", "bb"), send)
+    second = flight.request(_batch("bb", "ccc", "a"), send)
+    assert first["q1"] == second["q0"] == {"issueCount": 2}
+    assert second["q1"] == {"issueCount": 3}
+    assert second["q2"] == {"issueCount": 1}
+    assert len(sent) == 2
+    assert reviewers._COUNT_ALIAS.findall(sent[1]) == [("q1", "ccc")]
+    assert (flight.aliases, flight.saved) == (5, 2)
+    assert flight.summary() == "Single-flight saved 2 of 5 search aliases"
+
+
+def test_single_flight_skips_fully_answered_batch():
+    flight = reviewers._SingleFlight()
+    send = MagicMock(side_effect=_answer)
+    flight.request(_batch("a", "b"), send)
+    assert flight.request(_batch("b", "a"), send) == {
+        "q0": {"issueCount": 1},
+        "q1": {"issueCount": 1},
+    }
+    send.assert_called_once()
+
+
+def test_single_flight_expires_answers():
+    flight = reviewers._SingleFlight(ttl=0)
+    send = MagicMock(side_effect=_answer)
+    flight.request(_batch("a"), send)
+    flight.request(_batch("a"), send)
+    assert send.call_count == 2
+    assert flight.summary() == ""
+
+
+def test_single_flight_waits_for_in_flight_alias():
+    flight = reviewers._SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    sent = []
+
+    def slow_send(query):
+        sent.append(query)
+        started.set()
+        release.wait(5)
+        return _answer(query)
+
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(flight.request, _batch("shared", "x"), slow_send)
+        assert started.wait(5)
+        second = pool.submit(flight.request, _batch("y", "shared"), _answer)
+        threading.Event().wait(0.05)
+        assert not second.done()
+        release.set()
+        assert second.result()["q1"] == {"issueCount": 6}
+        assert first.result()["q0"] == {"issueCount": 6}
+    assert len(sent) == 1
+
+
+def test_single_flight_failure_reaches_borrowers():
+    flight = reviewers._SingleFlight()
+    own, _ = flight._plan(_batch("a"))
+    _, borrowed = flight._plan(_batch("a"))
+    flight._settle(own, error=RuntimeError("boom"))
+    with pytest.raises(RuntimeError, match="boom"):
+        borrowed["q0"].result()
+
+
+def test_single_flight_failed_search_is_asked_again():
+    flight = reviewers._SingleFlight()
+    with pytest.raises(RuntimeError, match="boom"):
+        flight.request(_batch("a"), MagicMock(side_effect=RuntimeError("boom")))
+    assert flight.request(_batch("a"), _answer) == {
+        "rateLimit": {"remaining": 100},
+        "q0": {"issueCount": 1},
+    }
+
+
+def test_single_flight_async_failure_reaches_borrowers():
+    """request_async() fails borrowers with the lender, then asks again."""
+    flight = reviewers._SingleFlight()
+    sent = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def fail(query):
+            sent.append(query)
+            await release.wait()
+            raise RuntimeError("boom")
+
+        lender = asyncio.ensure_future(flight.request_async(_batch("a"), fail))
+        await asyncio.sleep(0)
+        borrower = asyncio.ensure_future(flight.request_async(_batch("a"), fail))
+        await asyncio.sleep(0)
+        release.set()
+        failures = await asyncio.gather(lender, borrower, return_exceptions=True)
+
+        async def answer(query):
+            sent.append(query)
+            return _answer(query)
+
+        return failures, await flight.request_async(_batch("a"), answer)
+
+    failures, retried = asyncio.run(run())
+    assert [str(e) for e in failures] == ["boom", "boom"]
+    assert retried["q0"] == {"issueCount": 1}
+    assert len(sent) == 2
+
+
+def test_single_flight_null_alias_is_not_reused():
+    flight = reviewers._SingleFlight()
+    assert flight.request(_batch("a"), lambda q: {"q0": None}) == {"q0": None}
+    assert flight.request(_batch("a"), _answer)["q0"] == {"issueCount": 1}
+
+
+def test_single_flight_passes_other_queries_through():
+    send = MagicMock(return_value={"ok": True})
+    assert reviewers._SingleFlight().request("query { }", send) == {"ok": True}
+    send.assert_called_once_with("query { }")
+
+
+def test_repeated_phase_sends_no_requests(mock_graphql):
+    mock_graphql.side_effect = lambda query, *a, **k: _answer(query)
+    months = [("2024-01", "2024-01-01", "2024-01-31")]
+    first = reviewers.fetch_monthly_counts("o", "r", ["alice", "bob"], months)
+    calls = mock_graphql.call_count
+    assert reviewers.fetch_monthly_counts("o", "r", ["alice", "bob"], months) == first
+    assert mock_graphql.call_count == calls
+
+
+# --- _AliasPacker ---
+
+
+def test_packer_grows_after_healthy_window():
+    packer = reviewers._AliasPacker(20, window=3)
+    for _ in range(3):
+        packer.on_success(1.0)
+    assert packer.size == 22
+    for _ in range(3):
+        packer.on_success(1.0)
+    assert packer.size == 24
+
+
+def test_packer_capped_at_maximum():
+    packer = reviewers._AliasPacker(10, maximum=11, window=1)
+    for _ in range(5):
+        packer.on_success(1.0)
+    assert packer.size == 11
+    assert reviewers._AliasPacker(10).maximum == 40
+
+
+def test_packer_holds_while_latency_rises():
+    packer = reviewers._AliasPacker(20, window=2)
+    packer.on_success(1.0)
+    packer.on_success(1.6)
+    packer.on_success(1.0)
+    assert packer.size == 20
+
+
+def test_packer_never_shrinks_on_latency():
+    """A slow batch holds the size; only failures halve it."""
+    packer = reviewers._AliasPacker(20, window=2)
+    packer.on_success(1.0)
+    packer.on_success(5.0)
+    assert packer.size == 20
+    packer.on_success(1.0)
+    packer.on_success(1.0)
+    assert packer.size == 22
+
+
+def test_packer_compares_latency_per_alias():
+    """A batch twice the size may take twice as long without holding."""
+    packer = reviewers._AliasPacker(20, window=2)
+    packer.on_success(1.0, aliases=20)
+    packer.on_success(2.0, aliases=40)
+    assert packer.size == 22
+
+
+def test_packer_halves_once_per_burst():
+    packer = reviewers._AliasPacker(20)
+    tickets = [packer.ticket() for _ in range(3)]
+    for ticket in tickets:
+        packer.on_failure(ticket)
+    assert packer.size == 10
+    packer.on_failure(packer.ticket())
+    assert packer.size == 5
+
+
+def test_packer_floor():
+    packer = reviewers._AliasPacker(2)
+    for _ in range(5):
+        packer.on_failure()
+    assert packer.size == 1
+
+
+# --- _BatchQueue and _run_batches ---
+
+
+def _tasks(n):
+    return [(i, f"search {i}") for i in range(n)]
+
+
+def test_queue_packs_at_current_size():
+    packer = reviewers._AliasPacker(4)
+    queue = reviewers._BatchQueue(_tasks(10), packer)
+    assert len(queue.take()[0]) == 4
+    packer.on_failure()
+    assert len(queue.take()[0]) == 2
+    assert queue
+
+
+def test_queue_resends_only_failed_aliases():
+    packer = reviewers._AliasPacker(6)
+    queue = reviewers._BatchQueue(_tasks(6), packer)
+    batch = queue.take()
+    queue.settle(batch, failed=batch[0][1:4])
+    assert packer.size == 3
+    assert queue.take()[0] == [(1, "search 1"), (2, "search 2")]
+    assert queue.take()[0] == [(3, "search 3")]
+    assert not queue
+
+
+def test_queue_splits_batch_after_server_error():
+    queue = reviewers._BatchQueue(_tasks(5), reviewers._AliasPacker(5))
+    batch = queue.take()
+    queue.settle(batch, error=RuntimeError("POST failed: HTTP 502: Bad Gateway"))
+    assert [len(queue.take()[0]) for _ in range(2)] == [3, 2]
+
+
+def test_queue_splits_batch_over_node_limit():
+    queue = reviewers._BatchQueue(_tasks(4), reviewers._AliasPacker(4))
+    error = RuntimeError("GraphQL error: [{'type': 'MAX_NODE_LIMIT_EXCEEDED'}]")
+    queue.settle(queue.take(), error=error)
+    assert [len(queue.take()[0]) for _ in range(2)] == [2, 2]
+
+
+def test_queue_raises_other_errors():
+    queue = reviewers._BatchQueue(_tasks(5), reviewers._AliasPacker(5))
+    with pytest.raises(RuntimeError, match="401"):
+        queue.settle(queue.take(), error=RuntimeError("HTTP 401: Unauthorized"))
+
+
+def test_queue_raises_when_single_task_fails():
+    queue = reviewers._BatchQueue(_tasks(1), reviewers._AliasPacker(5))
+    batch = queue.take()
+    with pytest.raises(RuntimeError, match="search 0"):
+        queue.settle(batch, failed=batch[0])
+    with pytest.raises(TimeoutError):
+        queue.settle(batch, error=TimeoutError("timed out"))
+
+
+def test_run_batches_retries_failed_aliases():
+    sent = []
+    flaky = {3}
+
+    def send(chunk):
+        sent.append([key for key, _ in chunk])
+        failed = [task for task in chunk if task[0] in flaky]
+        flaky.clear()
+        results = {key: key * 10 for key, _ in chunk if (key, _) not in failed}
+        return results, failed, {}
+
+    packer = reviewers._AliasPacker(4)
+    results = {}
+    for partial, _ in reviewers._run_batches(_tasks(8), packer, send, max_workers=1):
+        results.update(partial)
+    assert results == {i: i * 10 for i in range(8)}
+    assert sent == [[0, 1, 2, 3], [3], [4, 5], [6, 7]]
+
+
+def test_run_batches_splits_failed_batch():
+    """A batch failing with a 502 is split in half and both halves retried."""
+    sent = []
+
+    def send(chunk):
+        sent.append([key for key, _ in chunk])
+        if len(sent) == 1:
+            raise RuntimeError("POST failed: HTTP 502: Bad Gateway")
+        return {key: key * 10 for key, _ in chunk}, [], {}
+
+    packer = reviewers._AliasPacker(4)
+    results = {}
+    for partial, _ in reviewers._run_batches(_tasks(4), packer, send, max_workers=1):
+        results.update(partial)
+    assert results == {i: i * 10 for i in range(4)}
+    assert sent == [[0, 1, 2, 3], [0, 1], [2, 3]]
+    assert packer.size == 2
+
+
+def test_null_alias_resent_on_its_own(mock_graphql):
+    """A search that errored inside a batch is re-sent without the others."""
+    queries = []
+
+    def graphql(query, allow_partial=False):
+        queries.append(query)
+        data = {}
+        for alias, search in reviewers._COUNT_ALIAS.findall(query):
+            failed = "2024-02" in search and len(queries) == 1
+            data[alias] = None if failed else {"issueCount": 1}
+        return data
+
+    mock_graphql.side_effect = graphql
+    months = [
+        ("2024-01", "2024-01-01", "2024-01-31"),
+        ("2024-02", "2024-02-01", "2024-02-29"),
+    ]
+    reviews, comments = reviewers.fetch_monthly_counts("o", "r", ["alice"], months)
+    assert reviews == {"alice": {"2024-01": 1, "2024-02": 1}}
+    assert comments == {"alice": {"2024-01": 1, "2024-02": 1}}
+    # Both failed aliases are re-sent, split in half; the January ones are not.
+    assert len(queries) == 3
+    for query in queries[1:]:
+        [(_, search)] = reviewers._COUNT_ALIAS.findall(query)
+        assert "2024-02" in search
+
+
+# --- _QueryPlanner ---
+
+
+def _count_everything(queries):
+    """A graphql stand-in answering every alias with its search's length."""
+
+    def graphql(query, allow_partial=False):
+        queries.append(reviewers._COUNT_ALIAS.findall(query))
+        return {alias: {"issueCount": len(q)} for alias, q in queries[-1]}
+
+    return graphql
+
+
+def test_planner_packs_phases_into_shared_batches(mock_graphql):
+    """Monthly and period counts share requests; results reach each phase."""
+    queries = []
+    mock_graphql.side_effect = _count_everything(queries)
+    planner = reviewers._QueryPlanner()
+    months = [("2024-01", "2024-01-01", "2024-01-31")]
+    reviews, comments = reviewers.fetch_monthly_counts(
+        "o", "r", ["alice"], months, planner
+    )
+    periods = reviewers.fetch_reviewer_period_counts("o", "r", ["bob"], planner)
+    assert len(planner) == 12
+    mock_graphql.assert_not_called()
+    planner.run()
+    # 2 monthly + 10 period aliases fit in a single request.
+    assert len(queries) == 1
+    assert len(planner) == 0
+    assert set(reviews["alice"]) == {"2024-01"}
+    assert set(comments["alice"]) == {"2024-01"}
+    assert set(periods["bob"]) == {"1", "3", "6", "12", "24"}
+    assert periods["bob"]["1"]["reviewed"] > 0
+
+
+def test_planner_priority_order():
+    """The current month goes first, then period counts, then history."""
+    now = reviewers.datetime.now(reviewers.timezone.utc)
+    current = f"{now.year:04d}-{now.month:02d}"
+    months = [
+        ("2001-01", "2001-01-01", "2001-01-31"),
+        (current, f"{current}-01", f"{current}-28"),
+    ]
+    planner = reviewers._QueryPlanner()
+    reviewers.fetch_monthly_counts("o", "r", ["alice"], months, planner)
+    reviewers.fetch_reviewer_period_counts("o", "r", ["alice"], planner)
+    reviewers._count_packer.maximum = reviewers._count_packer._size = 100
+    chunk, _, _ = planner._queue.take()
+    searches = [q for _, q in chunk]
+    assert all(current in q for q in searches[:2])
+    assert all("updated:>=" in q for q in searches[2:12])
+    assert all("2001-01" in q for q in searches[12:])
+
+
+def test_planner_run_async(mock_graphql):
+    queries = []
+    mock_graphql.side_effect = _count_everything(queries)
+    planner = reviewers._QueryPlanner()
+    periods = reviewers.fetch_reviewer_period_counts("o", "r", ["bob"], planner)
+    engine = reviewers._AsyncEngine(max_workers=2)
+    try:
+        engine.run(planner.run_async(engine))
+    finally:
+        engine.close()
+    assert len(queries) == 1
+    assert set(periods["bob"]) == {"1", "3", "6", "12", "24"}
+
+
+def test_planner_empty_sends_nothing(mock_graphql):
+    reviewers._QueryPlanner().run()
+    engine = reviewers._AsyncEngine(max_workers=1)
+    try:
+        engine.run(reviewers._QueryPlanner().run_async(engine))
+    finally:
+        engine.close()
+    mock_graphql.assert_not_called()
+
+
+# --- count bisection ---
+
+
+def _count_activity(queries, activity):
+    """A graphql stand-in counting PRs from {(login, kind): [created dates]}."""
+    search = re.compile(r"(reviewed-by|commenter):(\S+) .*created:(\S+)\.\.(\S+)")
+
+    def graphql(query, allow_partial=False):
+        queries.append(reviewers._COUNT_ALIAS.findall(query))
+        data = {}
+        for alias, q in queries[-1]:
+            qualifier, login, start, end = search.search(q).groups()
+            kind = "review" if qualifier == "reviewed-by" else "comment"
+            dates = activity.get((login, kind), [])
+            data[alias] = {"issueCount": sum(start <= d <= end for d in dates)}
+        return data
+
+    return graphql
+
+
+def test_split_month_span_years_then_quarters_then_months():
+    months = reviewers.generate_month_ranges("2022-11", "2024-02")
+    assert reviewers._split_month_span(months, 0, 15) == [(0, 1), (2, 13), (14, 15)]
+    # 2023 splits into its four quarters, Q2 into its months.
+    assert reviewers._split_month_span(months, 2, 13) == [
+        (2, 4),
+        (5, 7),
+        (8, 10),
+        (11, 13),
+    ]
+    assert reviewers._split_month_span(months, 5, 7) == [(5, 5), (6, 6), (7, 7)]
+
+
+def test_bisect_matches_grid_with_fewer_aliases(mock_graphql):
+    months = reviewers.generate_month_ranges("2015-01", "2022-12")
+    activity = {
+        ("alice", "review"): ["2016-03-04", "2016-03-20", "2021-11-30"],
+        ("alice", "comment"): ["2019-07-01"],
+        ("bob", "review"): [f"2018-{m:02d}-10" for m in range(1, 13)],
+    }
+    logins = ["alice", "bob", "carol"]
+    results = {}
+    aliases = {}
+    for strategy in reviewers.COUNT_STRATEGIES:
+        queries = []
+        mock_graphql.side_effect = _count_activity(queries, activity)
+        reviewers.configure_count_strategy(strategy)
+        results[strategy] = reviewers.fetch_monthly_counts("o", "r", logins, months)
+        aliases[strategy] = sum(len(batch) for batch in queries)
+    assert results["bisect"] == results["grid"]
+    assert results["grid"][0]["alice"] == {"2016-03": 2, "2021-11": 1}
+    assert results["grid"][0]["bob"]["2018-06"] == 1
+    assert aliases["grid"] == 2 * 3 * 96
+    assert aliases["bisect"] * 10 < aliases["grid"]
+
+
+def test_bisect_on_async_engine(mock_graphql):
+    queries = []
+    months = reviewers.generate_month_ranges("2020-01", "2021-12")
+    mock_graphql.side_effect = _count_activity(
+        queries, {("alice", "comment"): ["2020-05-05"]}
+    )
+    reviewers.configure_count_strategy("bisect")
+    planner = reviewers._QueryPlanner()
+    reviews, comments = reviewers.fetch_monthly_counts(
+        "o", "r", ["alice"], months, planner
+    )
+    engine = reviewers._AsyncEngine(max_workers=2)
+    try:
+        engine.run(planner.run_async(engine))
+    finally:
+        engine.close()
+    assert reviews == {"alice": {}}
+    assert comments == {"alice": {"2020-05": 1}}
+    # Whole range, 2 years, 4 quarters of 2020, 3 months of Q2.
+    assert len(queries) == 4
+
+
+def test_first_seen_clips_grid_without_losing_early_reviews(mock_graphql):
+    months = reviewers.generate_month_ranges("2015-01", "2022-12")
+    activity = {
+        ("alice", "review"): ["2021-03-04", "2022-01-10"],
+        # bob reviewed two years before discovery first saw them.
+        ("bob", "review"): ["2018-06-10", "2020-02-02"],
+    }
+    first_seen = {"alice": "2021-01", "bob": "2020-01"}
+    results = {}
+    aliases = {}
+    for clip in (None, first_seen):
+        queries = []
+        mock_graphql.side_effect = _count_activity(queries, activity)
+        results[clip is None] = reviewers.fetch_monthly_counts(
+            "o", "r", ["alice", "bob"], months, first_seen=clip
+        )
+        aliases[clip is None] = sum(len(batch) for batch in queries)
+    assert results[False] == results[True]
+    assert results[False][0]["bob"] == {"2018-06": 1, "2020-02": 1}
+    assert aliases[False] * 2 < aliases[True]
+
+
+def test_unknown_count_strategy_rejected():
+    with pytest.raises(ValueError):
+        reviewers.configure_count_strategy("sample")
@@ -2,8 +2,12 @@
 """Tests for fetch_repo_start, fetch_avatars, discover_reviewers,
 fetch_merge_counts, and fetch_monthly_counts."""
 
+import re
+from collections import Counter
 from unittest.mock import patch
 
+import pytest
+
 from conftest import reviewers
 
 
@@ -230,6 +234,23 @@ def test_discover_reviewers_single_chunk(mock_sleep, mock_graphql):
     assert mock_graphql.call_count == 2
 
 
+@patch("time.sleep")
+def test_discover_reviewers_reports_totals(mock_sleep, mock_graphql):
+    p1 = _phase1_response([_phase1_pr("alice", "bob")])
+    p2 = _phase2_response(q0=5, q1=3, q2=0, q3=1)
+    mock_graphql.side_effect = lambda query, variables=None, **kw: (
+        p1 if variables else p2
+    )
+    totals = {}
+    reviewers.discover_reviewers("o", "r", 10, start_month="2026-02", totals=totals)
+    assert totals == {
+        ("alice", "review"): 5,
+        ("alice", "comment"): 3,
+        ("bob", "review"): 0,
+        ("bob", "comment"): 1,
+    }
+
+
 @patch("time.sleep")
 def test_discover_reviewers_multiple_months(mock_sleep, mock_graphql):
     """Multi-month repo: Phase 1 scans all months, Phase 2 ranks."""
@@ -400,6 +421,280 @@ def test_discover_reviewers_no_start_month(mock_sleep, mock_graphql):
     assert mock_graphql.call_count == 3
 
 
+@patch("time.sleep")
+def test_discover_reviewers_tallies_merges_from_scan(mock_sleep, mock_graphql):
+    """Every page of a month feeds both candidates and merge tallies."""
+    pages = {
+        None: [_phase1_pr("alice", "bob"), _phase1_pr("bob", "bob")],
+        "c1": [_phase1_pr("carol", "bob"), _phase1_pr("dave")],
+    }
+    scans = []
+
+    def route(query, variables=None, allow_partial=False):
+        if variables:
+            scans.append(variables["cursor"])
+            response = _phase1_response(pages[variables["cursor"]])
+            if variables["cursor"] is None:
+                more = {"hasNextPage": True, "endCursor": "c1"}
+                response["search"]["pageInfo"] = more
+            return response
+        aliases = reviewers._COUNT_ALIAS.findall(query)
+        return _phase2_response(**{alias: 0 for alias, _ in aliases})
+
+    mock_graphql.side_effect = route
+    merges = {}
+    result = _discover_in("2026-01", merges=merges)
+
+    assert scans == [None, "c1"]
+    assert result == ["bob"]
+    # bob's own PR is a self-merge: it counts for discovery, not for tallies
+    assert merges == {"bob": {"2026-02": 2}}
+
+
+def _fake_discovery(prs, scores, calls, touched=()):
+    """Answer discovery scans from {month: [(author, merger)]} and count
+    aliases from {(login, kind): count}, logging scanned months and logins.
+    PRs updated since the last scoring are [(month, participants)]."""
+    qualifier = re.compile(r"(reviewed-by|commenter):(\S+)")
+
+    def graphql(query, variables=None, allow_partial=False):
+        if variables and "updated:>=" in variables["q"]:
+            calls.append("touched")
+            nodes = [
+                {
+                    "createdAt": f"{month}-10T00:00:00Z",
+                    "participants": {
+                        "totalCount": len(people),
+                        "nodes": [{"login": login} for login in people],
+                    },
+                }
+                for month, people in touched
+            ]
+            return _phase1_response(nodes)
+        if variables:
+            month = re.search(r"created:(\d{4}-\d{2})", variables["q"]).group(1)
+            calls.append(month)
+            nodes = [_phase1_pr(a, m) for a, m in prs.get(month, [])]
+            return _phase1_response(nodes)
+        data = {"rateLimit": {"remaining": 4000}}
+        for alias, q in reviewers._COUNT_ALIAS.findall(query):
+            kind, login = qualifier.search(q).groups()
+            kind = "review" if kind == "reviewed-by" else "comment"
+            calls.append(login)
+            data[alias] = {"issueCount": scores.get((login, kind), 0)}
+        return data
+
+    return graphql
+
+
+def _discover_in(month, **kwargs):
+    """Run discover_reviewers in a fresh process as if it were month."""
+    from datetime import datetime, timezone
+
+    year, mon = map(int, month.split("-"))
+    with (
+        patch.object(reviewers, "datetime") as mock_dt,
+        patch.object(reviewers, "_single_flight", reviewers._SingleFlight()),
+    ):
+        mock_dt.now.return_value = datetime(year, mon, 15, tzinfo=timezone.utc)
+        mock_dt.fromisoformat = datetime.fromisoformat
+        return reviewers.discover_reviewers("o", "r", 2, "2026-01", **kwargs)
+
+
+@patch("time.sleep")
+def test_discover_reviewers_incremental_matches_full_run(mock_sleep, mock_graphql):
+    prs = {
+        "2026-01": [("alice", "bob"), ("carol", None)],
+        "2026-02": [("dave", "bob")],
+    }
+    scores = {
+        ("alice", "review"): 5,
+        ("bob", "review"): 9,
+        ("carol", "comment"): 1,
+        ("dave", "review"): 7,
+    }
+    calls = []
+    mock_graphql.side_effect = _fake_discovery(prs, scores, calls)
+    state = {}
+    assert _discover_in("2026-02", state=state) == ["bob", "dave"]
+    assert state["end_month"] == "2026-02"
+    assert state["months"]["2026-01"] == {
+        "appearances": {"alice": 1, "bob": 1, "carol": 1},
+        "merges": {"bob": 1},
+    }
+    assert state["scores"] == {"alice": 5, "bob": 9, "carol": 1, "dave": 7}
+
+    # February gains a PR, March starts, and dave overtakes bob.
+    prs["2026-02"].append(("erin", None))
+    prs["2026-03"] = [("erin", "bob")]
+    scores[("dave", "review")] = 13
+    scores[("erin", "comment")] = 4
+    calls.clear()
+    incremental = _discover_in("2026-03", state=state)
+
+    # Only the in-progress and new months are rescanned; only candidates
+    # from those months and the cached top 2 are re-scored.
+    assert calls[0] == "touched"
+    assert [c for c in calls if c.startswith("2026")] == ["2026-02", "2026-03"]
+    logins = {c for c in calls[1:] if not c.startswith("2026")}
+    assert logins == {"bob", "dave", "erin"}
+    assert incremental == _discover_in("2026-03") == ["dave", "bob"]
+    assert state["scores"]["carol"] == 1
+
+
+@patch("time.sleep")
+def test_discover_reviewers_late_activity_matches_full_run(mock_sleep, mock_graphql):
+    """Late reviews and merges in an old month re-rank like a full run."""
+    prs = {
+        "2026-01": [("alice", "bob"), ("carol", None)],
+        "2026-02": [("dave", "bob")],
+    }
+    scores = {
+        ("alice", "review"): 5,
+        ("bob", "review"): 9,
+        ("carol", "comment"): 1,
+        ("dave", "review"): 7,
+    }
+    calls = []
+    mock_graphql.side_effect = _fake_discovery(prs, scores, calls)
+    state = {}
+    assert _discover_in("2026-02", state=state) == ["bob", "dave"]
+
+    # carol reviews January PRs heavily and merges her own, long after.
+    prs["2026-01"][1] = ("carol", "carol")
+    scores[("carol", "review")] = 20
+    touched = [("2026-01", ["alice", "carol"])]
+    calls.clear()
+    mock_graphql.side_effect = _fake_discovery(prs, scores, calls, touched)
+    incremental = _discover_in("2026-03", state=state)
+
+    # January is rescanned for its late merge, and its PRs' participants
+    # are re-scored along with the new months' candidates and the top 2.
+    assert [c for c in calls if c.startswith("2026")] == [
+        "2026-01",
+        "2026-02",
+        "2026-03",
+    ]
+    assert {c for c in calls[1:] if not c.startswith("2026")} == {
+        "alice",
+        "bob",
+        "carol",
+        "dave",
+    }
+    assert state["months"]["2026-01"]["merges"] == {"bob": 1, "carol": 1}
+    assert incremental == _discover_in("2026-03") == ["carol", "bob"]
+
+
+def test_discovery_touched_participants_overflow():
+    """A PR with too many participants to list re-scores everyone."""
+    crowded = {
+        "createdAt": "2026-01-10T00:00:00Z",
+        "participants": {"totalCount": 150, "nodes": [{"login": "alice"}, None]},
+    }
+    assert reviewers._discovery_touched([None, crowded]) == ({"2026-01"}, None)
+    state = {"scores": {"alice": 3, "bob": 1}}
+    candidates = Counter({"alice": 1, "bob": 1})
+    pruner = reviewers._discovery_pruner(
+        "o/r", state, {}, candidates, Counter(), 1, participants=None
+    )
+    assert set(pruner.seen) == {"alice", "bob"}
+
+
+@patch("time.sleep")
+def test_discover_reviewers_cached_months_honour_new_exclude(mock_sleep, mock_graphql):
+    """Cached months keep excluded logins, so --exclude can change later."""
+    prs = {"2026-01": [("alice", "bob")]}
+    scores = {("alice", "review"): 5, ("bob", "review"): 9}
+    mock_graphql.side_effect = _fake_discovery(prs, scores, [])
+    state = {}
+    assert _discover_in("2026-01", state=state, exclude={"bob"}) == ["alice"]
+    assert state["months"]["2026-01"]["appearances"] == {"alice": 1, "bob": 1}
+    assert _discover_in("2026-01", state=state) == ["bob", "alice"]
+
+
+def _pruner(seen, merges=None, top_n=1, prune=True):
+    """A _TopNPruner over Phase 1 appearances, one candidate per batch."""
+    packer = reviewers._AliasPacker(2)
+    return reviewers._TopNPruner(
+        "o/r", Counter(seen), Counter(merges or {}), top_n, packer, prune=prune
+    )
+
+
+def _fold_next(pruner, review, comment):
+    """Send the next batch and fold in the given counts."""
+    chunk, _, _ = pruner.queue.take()
+    (login, _), _ = chunk[0]
+    pruner.fold({(login, "review"): review, (login, "comment"): comment})
+    return login
+
+
+def test_top_n_pruner_counts_busiest_candidates_first():
+    pruner = _pruner({"carol": 1, "alice": 10, "bob": 8})
+    assert [_fold_next(pruner, 0, 0) for _ in range(3)] == ["alice", "bob", "carol"]
+
+
+def test_top_n_pruner_drops_candidates_below_threshold():
+    pruner = _pruner({"alice": 10, "bob": 8, "carol": 1, "dave": 1})
+    _fold_next(pruner, 20, 10)
+    # bob's bound is 8 * (1 + 3 * slack) and could still beat alice's 30
+    assert len(pruner.queue) == 6
+    _fold_next(pruner, 5, 3)
+    # carol's bound is 1 * (1 + 3 * slack) = 7 < 30
+    assert not pruner.queue
+    assert (pruner.pruned, pruner.dropped) == (2, 4)
+    assert pruner.combined == {"alice": 30, "bob": 8}
+
+
+def test_top_n_pruner_counts_everyone_without_prune():
+    pruner = _pruner({"alice": 10, "bob": 8, "carol": 1, "dave": 1}, prune=False)
+    for _ in range(4):
+        _fold_next(pruner, 20, 10)
+    assert not pruner.queue
+    assert (pruner.pruned, pruner.dropped) == (0, 0)
+    assert len(pruner.counted) == 4
+
+
+@patch("time.sleep")
+def test_discover_reviewers_counts_every_candidate_by_default(
+    mock_sleep, mock_graphql, capsys
+):
+    """Without --prune a rare author who reviews heavily still makes the cut."""
+    prs = {"2026-01": [("alice", "bob")] * 10 + [("carol", None), ("zed", None)]}
+    scores = {("alice", "review"): 30, ("bob", "review"): 25, ("zed", "review"): 99}
+    calls = []
+    mock_graphql.side_effect = _fake_discovery(prs, scores, calls)
+    assert _discover_in("2026-01") == ["zed", "bob"]
+    assert {"alice", "bob", "carol", "zed"} <= set(calls)
+    assert "Skipped" not in capsys.readouterr().out
+
+
+def test_rank_candidates_reports_skipped(capsys):
+    assert reviewers._rank_candidates({"alice": 3}, {}, 1, pruned=4) == ["alice"]
+    assert "Skipped 4 candidates" in capsys.readouterr().out
+
+
+def test_top_n_pruner_waits_for_top_n_counted():
+    pruner = _pruner({"alice": 10, "bob": 5, "carol": 1, "dave": 1}, top_n=2)
+    _fold_next(pruner, 20, 10)
+    # only one candidate counted: no N-th best score to prune against yet
+    assert len(pruner.queue) == 6
+    _fold_next(pruner, 5, 5)
+    # carol's bound 1 * (1 + 3 * slack) = 7 < bob's 10
+    assert pruner.pruned == 2
+
+
+def test_top_n_pruner_keeps_mergers_in_bound():
+    # bob merges every PR they appear in and is never searchable
+    pruner = _pruner({"alice": 4, "bob": 3}, merges={"bob": 3})
+    _fold_next(pruner, 2, 0)
+    # alice scores 2; bob's bound 3 * (1 + 0.5 * slack) = 6 >= 2
+    assert len(pruner.queue) == 2
+    _fold_next(pruner, 0, 0)
+    assert reviewers._rank_candidates(pruner.combined, pruner.merge_counts, 1) == [
+        "bob"
+    ]
+
+
 # ---------- fetch_merge_counts ----------
 
 
@@ -499,6 +794,77 @@ def test_fetch_merge_counts_pagination(mock_sleep, mock_graphql):
     assert mock_graphql.call_count == 2
 
 
+def test_scan_range_warns_on_crowded_single_day(mock_graphql):
+    """A day with more PRs than one search returns is paged as far as it goes."""
+    node = {"createdAt": "2024-01-05T00:00:00Z", "author": None, "mergedBy": None}
+    mock_graphql.return_value = {
+        "search": {
+            "issueCount": 1500,
+            "pageInfo": {"hasNextPage": False, "endCursor": None},
+            "nodes": [node],
+        }
+    }
+    with patch.object(reviewers.progress, "update") as mock_update:
+        nodes, pieces = reviewers._scan_range(
+            "repo:o/r is:pr", "2024-01-05", "2024-01-05"
+        )
+    assert (nodes, pieces) == ([node], [])
+    mock_update.assert_called_once_with(
+        "Warning: 2024-01-05 has 1000+ PRs, results may be truncated"
+    )
+
+
+def test_split_date_range_halves_weeks_days():
+    split = reviewers._split_date_range
+    assert split("2024-01-01", "2024-01-31") == [
+        ("2024-01-01", "2024-01-16"),
+        ("2024-01-17", "2024-01-31"),
+    ]
+    assert split("2024-01-01", "2024-01-16") == [
+        ("2024-01-01", "2024-01-07"),
+        ("2024-01-08", "2024-01-14"),
+        ("2024-01-15", "2024-01-16"),
+    ]
+    assert split("2024-01-01", "2024-01-03") == [
+        ("2024-01-01", "2024-01-01"),
+        ("2024-01-02", "2024-01-02"),
+        ("2024-01-03", "2024-01-03"),
+    ]
+    assert split("2024-01-01", "2024-01-01") == []
+
+
+@patch("time.sleep")
+def test_fetch_merge_counts_splits_crowded_month(mock_sleep, mock_graphql):
+    """A month over the search cap is scanned as two halves, not truncated."""
+    month_ranges = [("2024-01", "2024-01-01", "2024-01-31")]
+
+    def search(query, variables=None, **kwargs):
+        start, end = re.search(r"created:(\S+)\.\.(\S+)", variables["q"]).groups()
+        return {
+            "search": {
+                "issueCount": 1500 if (start, end) == month_ranges[0][1:] else 750,
+                "pageInfo": {"hasNextPage": False, "endCursor": None},
+                "nodes": [
+                    {
+                        "createdAt": f"{start}T00:00:00Z",
+                        "author": {"login": "x"},
+                        "mergedBy": {"login": "alice"},
+                    }
+                ],
+            }
+        }
+
+    mock_graphql.side_effect = search
+    result = reviewers.fetch_merge_counts("o", "r", ["alice"], month_ranges)
+    assert result["alice"]["2024-01"] == 2
+    queries = [c.args[1]["q"] for c in mock_graphql.call_args_list]
+    assert sorted(q.split("created:")[1] for q in queries) == [
+        "2024-01-01..2024-01-16",
+        "2024-01-01..2024-01-31",
+        "2024-01-17..2024-01-31",
+    ]
+
+
 @patch("time.sleep")
 def test_fetch_merge_counts_null_merged_by(mock_sleep, mock_graphql):
     """PRs with mergedBy: None are skipped."""
@@ -527,6 +893,17 @@ def test_fetch_merge_counts_null_merged_by(mock_sleep, mock_graphql):
 # ---------- fetch_monthly_counts ----------
 
 
+def test_first_seen_from_discovery_state():
+    state = {
+        "months": {
+            "2024-02": {"appearances": {"alice": 1, "bob": 3}, "merges": {}},
+            "2024-01": {"appearances": {"bob": 1}, "merges": {"bob": 1}},
+        }
+    }
+    assert reviewers._first_seen(state) == {"alice": "2024-02", "bob": "2024-01"}
+    assert reviewers._first_seen({}) == {}
+
+
 @patch("time.sleep")
 def test_fetch_monthly_counts_basic(mock_sleep, mock_graphql):
     month_ranges = [
@@ -602,6 +979,266 @@ def test_fetch_monthly_counts_zero_counts_omitted(mock_sleep, mock_graphql):
     assert comments["alice"] == {}
 
 
+def _fake_search(activity, calls):
+    """Answer count aliases and paginated scans from {(login, kind): dates}."""
+    search = re.compile(r"(reviewed-by|commenter):(\S+) .*created:(\S+)\.\.(\S+)")
+
+    def matching(q):
+        qualifier, login, start, end = search.search(q).groups()
+        kind = "review" if qualifier == "reviewed-by" else "comment"
+        return [d for d in activity.get((login, kind), []) if start <= d <= end]
+
+    def graphql(query, variables=None, allow_partial=False):
+        data = {"rateLimit": {"remaining": 4000, "resetAt": ""}}
+        if variables:
+            calls.append(variables)
+            dates = sorted(matching(variables["q"]))
+            offset = int(variables["cursor"] or 0)
+            page = dates[offset : offset + 100]
+            more = offset + 100 < len(dates)
+            data["search"] = {
+                "pageInfo": {"hasNextPage": more, "endCursor": str(offset + 100)},
+                "nodes": [{"createdAt": f"{d}T12:00:00Z"} for d in page],
+            }
+            return data
+        for alias, q in reviewers._COUNT_ALIAS.findall(query):
+            calls.append(alias)
+            data[alias] = {"issueCount": len(matching(q))}
+        return data
+
+    return graphql
+
+
+def test_prefers_scan():
+    # 150 PRs over 200 months: 2 pages instead of 8 requests' worth of aliases.
+    assert reviewers._prefers_scan(150, 200)
+    assert reviewers._prefers_scan(0, 1)
+    assert not reviewers._prefers_scan(150, 2)
+    assert not reviewers._prefers_scan(1001, 10000)
+
+
+@patch("time.sleep")
+def test_fetch_monthly_counts_scans_when_cheaper(mock_sleep, mock_graphql):
+    """Sparse (login, kind) pairs are paged through; results match the grid."""
+    months = reviewers.generate_month_ranges("2010-01", "2019-12")
+    activity = {
+        ("alice", "review"): [f"2012-{m:02d}-0{d}" for m in range(1, 13) for d in "12"]
+        * 5,
+        ("bob", "review"): [f"2015-{m:02d}-15" for m in range(1, 13)] * 30,
+    }
+    totals = {
+        ("alice", "review"): 120,
+        ("alice", "comment"): 0,
+        ("bob", "review"): 360,
+        ("bob", "comment"): 0,
+    }
+    grid_calls, calls = [], []
+    mock_graphql.side_effect = _fake_search(activity, grid_calls)
+    expected = reviewers.fetch_monthly_counts("o", "r", ["alice", "bob"], months)
+    mock_graphql.side_effect = _fake_search(activity, calls)
+    result = reviewers.fetch_monthly_counts(
+        "o", "r", ["alice", "bob"], months, totals=totals
+    )
+    assert result == expected
+    assert result[0]["alice"]["2012-03"] == 10
+    # alice's reviews take 2 pages, bob's 4; zero totals need no requests.
+    scans = [call for call in calls if isinstance(call, dict)]
+    assert len(scans) == 6
+    assert all("sort:created-asc" in call["q"] for call in scans)
+    assert not [call for call in calls if isinstance(call, str)]
+    assert len(grid_calls) == 2 * 2 * 120
+
+
+@patch("time.sleep")
+def test_fetch_monthly_counts_keeps_grid_for_dense_reviewers(mock_sleep, mock_graphql):
+    months = reviewers.generate_month_ranges("2024-01", "2024-03")
+    calls = []
+    mock_graphql.side_effect = _fake_search({}, calls)
+    totals = {("alice", "review"): 50, ("alice", "comment"): 2000}
+    reviewers.fetch_monthly_counts("o", "r", ["alice"], months, totals=totals)
+    assert len(calls) == 6
+    assert all(isinstance(call, str) for call in calls)
+
+
+# ---------- fetch_review_contributions ----------
+
+
+_CONTRIBUTION_ALIAS = re.compile(
+    r'(y\d{4}): contributionsCollection\(from: "([^"]+)", to: "([^"]+)"\)'
+    r'.*?maxRepositories: (\d+)\).*?\(first: 100(?:, after: "(\d+)")?\)',
+    re.DOTALL,
+)
+
+
+def _review_node(number, created, repo="o/r", author="carol"):
+    return {
+        "repository": {"nameWithOwner": repo},
+        "pullRequest": {
+            "number": number,
+            "createdAt": f"{created}T08:00:00Z",
+            "author": {"login": author},
+        },
+    }
+
+
+def _fake_contributions(by_year, calls):
+    """Answer contributionsCollection aliases from {year alias: [nodes]}.
+
+    Each year lists its repositories busiest first, each paged on its own.
+    """
+
+    def graphql(query, variables=None, allow_partial=False):
+        calls.append(query)
+        user = {}
+        for alias, _, _, repos, cursor in _CONTRIBUTION_ALIAS.findall(query):
+            by_repo = {}
+            for node in by_year.get(alias, []):
+                by_repo.setdefault(node["repository"]["nameWithOwner"], []).append(
+                    {"pullRequest": node["pullRequest"]}
+                )
+            busiest = sorted(by_repo.items(), key=lambda item: -len(item[1]))
+            offset = int(cursor or 0)
+            user[alias] = {
+                "restrictedContributionsCount": 1,
+                "pullRequestReviewContributionsByRepository": [
+                    {
+                        "repository": {"nameWithOwner": repo},
+                        "contributions": {
+                            "pageInfo": {
+                                "hasNextPage": offset + 100 < len(nodes),
+                                "endCursor": str(offset + 100),
+                            },
+                            "nodes": nodes[offset : offset + 100],
+                        },
+                    }
+                    for repo, nodes in busiest[: int(repos)]
+                ],
+            }
+        return {"rateLimit": {"remaining": 4000, "resetAt": ""}, "user": user}
+
+    return graphql
+
+
+def test_contribution_windows():
+    months = reviewers.generate_month_ranges("2024-11", "2025-02")
+    windows = reviewers._contribution_windows(months)
+    assert windows[0] == ("y2024", "2024-11-01T00:00:00Z", "2024-12-31T23:59:59Z")
+    assert windows[1] == ("y2025", "2025-01-01T00:00:00Z", "2025-12-31T23:59:59Z")
+    now = reviewers.datetime.now(reviewers.timezone.utc)
+    assert windows[-1][0] == f"y{now.year}"
+    assert windows[-1][2].startswith(f"{now.year:04d}-{now.month:02d}")
+
+
+@patch("time.sleep")
+def test_fetch_review_contributions(mock_sleep, mock_graphql):
+    """Reviews fold into distinct PRs of this repo, bucketed by creation month."""
+    months = reviewers.generate_month_ranges("2024-11", "2025-02")
+    # 150 reviews in 2025 need a second page; PR 7 was reviewed twice.
+    by_year = {
+        "y2024": [
+            _review_node(7, "2024-11-03"),
+            _review_node(7, "2024-11-03"),
+            _review_node(8, "2024-12-24", repo="o/other"),
+            _review_node(9, "2024-12-25", author="Alice"),
+        ],
+        "y2025": [_review_node(100 + i, "2025-02-10") for i in range(150)],
+    }
+    calls = []
+    mock_graphql.side_effect = _fake_contributions(by_year, calls)
+    monthly, restricted = reviewers.fetch_review_contributions(
+        "o", "r", ["alice"], months
+    )
+    assert monthly == {"alice": {"2024-11": 1, "2025-02": 150}}
+    # One restricted contribution per year window, counted once each.
+    assert restricted["alice"] == len(reviewers._contribution_windows(months))
+    assert len(calls) == 2
+    assert 'after: "100"' in calls[1] and "y2024" not in calls[1]
+
+
+@patch("time.sleep")
+def test_review_contributions_read_only_this_repo(mock_sleep, mock_graphql):
+    """Later pages list repositories only as far as this one."""
+    months = reviewers.generate_month_ranges("2025-01", "2025-02")
+    by_year = {
+        "y2025": [_review_node(i, "2025-01-10", repo="o/big") for i in range(300)]
+        + [_review_node(1000 + i, "2025-02-10") for i in range(120)]
+    }
+    calls = []
+    mock_graphql.side_effect = _fake_contributions(by_year, calls)
+    monthly, _ = reviewers.fetch_review_contributions("o", "r", ["alice"], months)
+    assert monthly == {"alice": {"2025-02": 120}}
+    assert len(calls) == 2
+    assert "maxRepositories: 25" in calls[0]
+    assert "maxRepositories: 2" in calls[1] and 'after: "100"' in calls[1]
+
+
+@patch("time.sleep")
+def test_review_contributions_beyond_listed_repos(mock_sleep, mock_graphql):
+    """Past the first 25 repositories the list is widened, past 100 searched."""
+    months = reviewers.generate_month_ranges("2025-01", "2025-02")
+    busy = [
+        _review_node(f"{n}-{i}", "2025-01-10", repo=f"o/busy{n}")
+        for n in range(40)
+        for i in range(2)
+    ]
+    by_year = {"y2025": [*busy, _review_node(1, "2025-02-10")]}
+    calls = []
+    contributions = _fake_contributions(by_year, calls)
+    mock_graphql.side_effect = contributions
+    monthly, restricted = reviewers.fetch_review_contributions(
+        "o", "r", ["alice"], months
+    )
+    assert monthly == {"alice": {"2025-02": 1}}
+    assert "maxRepositories: 100" in calls[1]
+    # The widened page does not count the year's restricted reviews again.
+    assert restricted["alice"] == len(reviewers._contribution_windows(months))
+
+    # Busy in over 100 repositories: reviewed-by searches count instead.
+    by_year["y2025"] = [
+        _review_node(f"{n}-{i}", "2025-01-10", repo=f"o/busy{n}")
+        for n in range(100)
+        for i in range(2)
+    ] + [_review_node(1, "2025-02-10")]
+    searched = []
+
+    def graphql(query, variables=None, allow_partial=False):
+        if "contributionsCollection" in query:
+            return contributions(query)
+        data = {"rateLimit": {"remaining": 4000, "resetAt": ""}}
+        for alias, q in reviewers._COUNT_ALIAS.findall(query):
+            searched.append(q)
+            data[alias] = {"issueCount": 1 if "created:2025-02" in q else 0}
+        return data
+
+    mock_graphql.side_effect = graphql
+    monthly, _ = reviewers.fetch_review_contributions("o", "r", ["alice"], months)
+    assert monthly == {"alice": {"2025-02": 1}}
+    assert searched and all("reviewed-by:alice" in q for q in searched)
+
+
+def test_unknown_review_source_rejected():
+    with pytest.raises(ValueError, match="unknown review source"):
+        reviewers.configure_review_source("timeline")
+    assert reviewers._review_source == "search"
+
+
+@patch("time.sleep")
+def test_reconcile_review_counts(mock_sleep, mock_graphql):
+    months = reviewers.generate_month_ranges("2024-01", "2024-04")
+    activity = {("alice", "review"): ["2024-02-02", "2024-02-03", "2024-04-01"]}
+    calls = []
+    mock_graphql.side_effect = _fake_search(activity, calls)
+    check = reviewers.reconcile_review_counts(
+        "o", "r", {"alice": {"2024-02": 2, "2024-03": 1}}, months
+    )
+    assert check["sampled"] == 4
+    assert check["matching"] == 2
+    assert check["mismatches"] == [
+        {"login": "alice", "month": "2024-03", "search": 0, "contributions": 1},
+        {"login": "alice", "month": "2024-04", "search": 1, "contributions": 0},
+    ]
+
+
 # ---------- fetch_reviewer_period_counts ----------
 
 
@@ -683,6 +1320,97 @@ def test_fetch_reviewer_period_counts_day_clamping(mock_sleep, mock_graphql):
     assert "updated:>=2026-02-28" in query_arg
 
 
+@patch("time.sleep")
+def test_fetch_reviewer_period_counts_reuse(mock_sleep, mock_graphql):
+    """Reused counts are copied into the result and not fetched."""
+    queries = []
+
+    def side_effect(query, **kwargs):
+        queries.extend(re.findall(r'query: "([^"]*)"', query))
+        data = {"rateLimit": {"remaining": 4000, "resetAt": ""}}
+        for i in range(25):
+            if f"q{i}:" in query:
+                data[f"q{i}"] = {"issueCount": 7}
+        return data
+
+    mock_graphql.side_effect = side_effect
+    reuse = {"alice": {"1": {"reviewed": 0, "commented": 0}, "3": {"reviewed": 4}}}
+    result = reviewers.fetch_reviewer_period_counts("o", "r", ["alice"], reuse=reuse)
+    assert len(queries) == 10 - 3
+    assert result["alice"]["1"] == {"reviewed": 0, "commented": 0}
+    assert result["alice"]["3"] == {"reviewed": 4, "commented": 7}
+    assert result["alice"]["24"] == {"reviewed": 7, "commented": 7}
+
+
+def test_reusable_period_counts_keeps_zeros_and_unmoved_windows():
+    from datetime import datetime, timezone
+
+    cached = {
+        "1": {"reviewed": 0, "commented": 3},
+        "24": {"reviewed": 5, "commented": 0},
+    }
+    with patch.object(reviewers, "datetime") as mock_dt:
+        mock_dt.fromisoformat = datetime.fromisoformat
+        mock_dt.now.return_value = datetime(2024, 5, 15, 18, tzinfo=timezone.utc)
+        later = reviewers._reusable_period_counts(cached, "2024-05-01T00:00:00Z")
+        same_day = reviewers._reusable_period_counts(cached, "2024-05-15T06:00:00Z")
+    assert later == {"1": {"reviewed": 0}, "24": {"commented": 0}}
+    assert same_day == cached
+
+
+# ---------- probe_reviewer_changes ----------
+
+
+@patch("time.sleep")
+def test_probe_reviewer_changes(mock_sleep, mock_graphql):
+    """Logins with any PR updated since the last run are reported changed."""
+    queries = []
+
+    def side_effect(query, **kwargs):
+        data = {"rateLimit": {"remaining": 4000, "resetAt": ""}}
+        for alias, q in re.findall(r'(\w+): search\(query: "([^"]*)"', query):
+            queries.append(q)
+            data[alias] = {"issueCount": int("commenter:bob " in q)}
+        return data
+
+    mock_graphql.side_effect = side_effect
+    changed = reviewers.probe_reviewer_changes(
+        "o", "r", ["alice", "bob"], "2024-05-01T00:00:00Z"
+    )
+    assert changed == {"bob"}
+    assert len(queries) == 4
+    assert all(q.endswith(" updated:>=2024-05-01T00:00:00+00:00") for q in queries)
+    assert mock_graphql.call_count == 1
+
+
+# ---------- fetch_late_activity_months ----------
+
+
+@patch("time.sleep")
+def test_fetch_late_activity_months(mock_sleep, mock_graphql):
+    """One createdAt-only scan over the sealed span finds the touched months."""
+    month_ranges = reviewers.generate_month_ranges("2023-11", "2024-02")
+    created = ["2023-11-03", "2024-01-20", "2024-01-21", "2024-04-02"]
+    mock_graphql.return_value = {
+        "search": {
+            "issueCount": len(created),
+            "pageInfo": {"hasNextPage": False, "endCursor": None},
+            "nodes": [{"createdAt": f"{day}T00:00:00Z"} for day in created],
+        }
+    }
+    months = reviewers.fetch_late_activity_months(
+        "o", "r", "2024-05-01T00:00:00Z", month_ranges
+    )
+    assert months == {"2023-11", "2024-01"}
+    query, variables = mock_graphql.call_args[0]
+    assert query == reviewers.CREATED_SEARCH_QUERY
+    assert variables["q"] == (
+        "repo:o/r is:pr updated:>=2024-05-01T00:00:00+00:00 "
+        "created:2023-11-01..2024-02-29"
+    )
+    assert reviewers.fetch_late_activity_months("o", "r", "x", []) == set()
+
+
 # ---------- _scrape_search_count ----------
 
 
@@ -873,6 +1601,16 @@ def test_scrape_unsearchable_scrapes_active(mock_scrape, mock_sleep):
     assert period_counts["alice"]["1"]["reviewed"] == 10
 
 
+@patch.object(reviewers, "_scrape_search_count")
+def test_scrape_unsearchable_offline(mock_scrape, tmp_path):
+    """Offline runs never scrape; the period counts stay as cached."""
+    reviewers.configure_response_cache(str(tmp_path), offline=True)
+    period_counts = {"bob": {"1": {"reviewed": 0, "commented": 0}}}
+    reviewers_data = {"bob": {"merge_monthly": {"2024-01": 5}}}
+    reviewers.scrape_unsearchable_period_counts("o", "r", period_counts, reviewers_data)
+    mock_scrape.assert_not_called()
+
+
 @patch("time.sleep")
 @patch.object(reviewers, "_scrape_search_count")
 def test_scrape_unsearchable_gate_skips_zero_users(mock_scrape, mock_sleep):
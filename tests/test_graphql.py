@@ -120,6 +120,16 @@ class TestGraphqlRequest:
             reviewers._graphql_request("query { }")
         assert mock_run.call_count == 6
 
+    def test_subprocess_deadline(self, mock_run, mock_sleep, mock_rl):
+        """A stuck gh subprocess is killed at the deadline and retried."""
+        mock_run.side_effect = [
+            subprocess.TimeoutExpired(["gh"], 60),
+            _success({"data": {"ok": True}}),
+        ]
+        result = reviewers._graphql_request("query { }")
+        assert result == {"ok": True}
+        assert mock_run.call_args.kwargs["timeout"] == reviewers.REQUEST_TIMEOUT
+
     def test_proactive_rate_limit_pause(self, mock_run, mock_sleep, mock_rl):
         mock_run.return_value = _success(
             {
@@ -2,8 +2,12 @@
 """Integration tests for main()."""
 
 import json
+import os
+import threading
 from unittest.mock import patch
 
+import pytest
+
 from conftest import reviewers
 
 
@@ -24,6 +28,7 @@ def test_main_with_cache(mock_output, mock_wb, sample_cached_data, tmp_path, cap
             reviewers, "incremental_update", return_value=sample_cached_data
         ) as mock_inc,
         patch.object(reviewers, "fetch_repo_start") as mock_start,
+        patch.object(reviewers._ResponseCache, "evict") as mock_evict,
     ):
         reviewers.main(
             [
@@ -34,9 +39,10 @@ def test_main_with_cache(mock_output, mock_wb, sample_cached_data, tmp_path, cap
         )
 
         mock_inc.assert_called_once_with(
-            sample_cached_data, "owner", "repo", 100, exclude=frozenset()
+            sample_cached_data, "owner", "repo", 100, exclude=frozenset(), engine=None
         )
         mock_start.assert_not_called()
+        mock_evict.assert_called_once_with()
 
     mock_output.assert_called_once()
     assert mock_output.call_args[0][1] == str(tmp_path / "owner" / "repo")
@@ -45,6 +51,31 @@ def test_main_with_cache(mock_output, mock_wb, sample_cached_data, tmp_path, cap
     assert len(data_arg["reviewers"]) == 2
 
 
+def test_main_refetches_cache_from_other_review_source(
+    sample_cached_data, tmp_path, capsys
+):
+    """Search-based review counts are not mixed with contribution-based ones."""
+    _write_cache(tmp_path, sample_cached_data)
+    with (
+        patch.object(reviewers, "incremental_update") as mock_inc,
+        patch.object(
+            reviewers, "fetch_repo_start", side_effect=RuntimeError("fresh fetch")
+        ),
+        pytest.raises(RuntimeError, match="fresh fetch"),
+    ):
+        reviewers.main(
+            [
+                "--output",
+                str(tmp_path),
+                "--review-source",
+                "contributions",
+                "owner/repo",
+            ]
+        )
+    mock_inc.assert_not_called()
+    assert "has review counts from search, re-fetching" in capsys.readouterr().out
+
+
 @patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
 @patch.object(reviewers, "webbrowser")
 @patch.object(reviewers, "generate_output")
@@ -74,7 +105,6 @@ def test_main_stale_cache(mock_output, mock_wb, mock_rl, tmp_path, capsys):
             "fetch_monthly_counts",
             return_value=({"alice": {}}, {"alice": {}}),
         ),
-        patch.object(reviewers, "fetch_merge_counts", return_value={"alice": {}}),
         patch.object(
             reviewers, "fetch_reviewer_period_counts", return_value={"alice": {}}
         ),
@@ -128,7 +158,6 @@ def test_main_refresh_flag(
             "fetch_monthly_counts",
             return_value=({"alice": {}}, {"alice": {}}),
         ),
-        patch.object(reviewers, "fetch_merge_counts", return_value={"alice": {}}),
         patch.object(
             reviewers, "fetch_reviewer_period_counts", return_value={"alice": {}}
         ),
@@ -161,6 +190,8 @@ def test_main_refresh_flag(
             ]
         )
         mock_disc.assert_called_once()
+    # Cached API responses are re-fetched too.
+    assert reviewers._response_cache.refresh
 
 
 @patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
@@ -169,7 +200,13 @@ def test_main_refresh_flag(
 def test_main_no_cache(mock_output, mock_wb, mock_rl, tmp_path, capsys):
     """No cache file triggers full fetch pipeline."""
     with (
-        patch.object(reviewers, "discover_reviewers", return_value=["alice", "bob"]),
+        patch.object(
+            reviewers,
+            "discover_reviewers",
+            side_effect=_discovers(
+                ["alice", "bob"], {"alice": {"2024-01": 3}, "bob": {"2024-01": 1}}
+            ),
+        ),
         patch.object(reviewers, "fetch_repo_start", return_value="2024-01"),
         patch.object(
             reviewers,
@@ -187,14 +224,7 @@ def test_main_no_cache(mock_output, mock_wb, mock_rl, tmp_path, capsys):
                 {"alice": {"2024-01": 2}, "bob": {}},
             ),
         ),
-        patch.object(
-            reviewers,
-            "fetch_merge_counts",
-            return_value={
-                "alice": {"2024-01": 3},
-                "bob": {"2024-01": 1},
-            },
-        ),
+        patch.object(reviewers, "fetch_merge_counts") as mock_merge,
         patch.object(
             reviewers,
             "fetch_reviewer_period_counts",
@@ -238,6 +268,50 @@ def test_main_no_cache(mock_output, mock_wb, mock_rl, tmp_path, capsys):
     logins = [r["login"] for r in data_arg["reviewers"]]
     assert "alice" in logins
     assert "bob" in logins
+    # Merge counts come from discovery's PR scan, not a second one
+    mock_merge.assert_not_called()
+    saved = json.loads((tmp_path / "owner" / "repo" / "data.json").read_text())
+    assert saved["reviewers"]["alice"]["merge_monthly"] == {"2024-01": 3}
+
+
+@patch.object(reviewers, "webbrowser")
+@patch.object(reviewers, "generate_output")
+def test_main_budgets_discovery_scan(mock_output, mock_wb, tmp_path):
+    """A fresh run checks the budget, sized by the PR count, before discovery."""
+    budgets = []
+
+    def discover(*args, **kwargs):
+        assert budgets, "discovery ran before the budget check"
+        return ["alice"]
+
+    activity = {
+        "last_pr_updated_at": "2024-01-15T00:00:00Z",
+        "total_pr_count": 50_000,
+        "total_merged_prs": 20,
+        "total_reviewed_prs": 30,
+        "total_commented_prs": 15,
+        "repo_totals": {
+            key: {"reviewed": 30, "commented": 15, "merged": 20}
+            for key in ("all", "1", "3", "6", "12", "24")
+        },
+    }
+    with (
+        patch.object(reviewers, "discover_reviewers", side_effect=discover),
+        patch.object(reviewers, "check_rate_limit_budget", side_effect=budgets.append),
+        patch.object(reviewers, "fetch_repo_start", return_value="2024-01"),
+        patch.object(reviewers, "fetch_repo_activity", return_value=activity),
+        patch.object(reviewers, "fetch_avatars", return_value={"alice": "url"}),
+        patch.object(
+            reviewers, "fetch_monthly_counts", return_value=({"alice": {}}, {})
+        ),
+        patch.object(
+            reviewers, "fetch_reviewer_period_counts", return_value={"alice": {}}
+        ),
+    ):
+        reviewers.main(["--output", str(tmp_path), "owner/repo"])
+
+    # Discovery pages through all 50,000 PRs: at least 500 requests.
+    assert budgets[0] > 500
 
 
 @patch.object(reviewers, "webbrowser")
@@ -262,6 +336,72 @@ def test_main_output_summary(
     assert "owner/repo" in captured.out
 
 
+@patch.object(reviewers, "webbrowser")
+@patch.object(reviewers, "generate_output")
+def test_main_reports_hedges(
+    mock_output, mock_wb, sample_cached_data, tmp_path, capsys
+):
+    """--hedge enables hedging and the summary reports the quota it spent."""
+    _write_cache(tmp_path, sample_cached_data)
+
+    def update(*args, **kwargs):
+        assert reviewers._hedger.enabled
+        reviewers._hedger.requests, reviewers._hedger.sent = 40, 2
+        return sample_cached_data
+
+    with patch.object(reviewers, "incremental_update", side_effect=update):
+        reviewers.main(["--output", str(tmp_path), "--hedge", "owner/repo"])
+
+    assert "Hedged 2 of 40 count batches" in capsys.readouterr().out
+
+
+@patch.object(reviewers, "webbrowser")
+@patch.object(reviewers, "generate_output")
+def test_main_reports_credential_shares(
+    mock_output, mock_wb, sample_cached_data, tmp_path, capsys
+):
+    """With a credential pool the summary shows how requests were spread."""
+    _write_cache(tmp_path, sample_cached_data)
+
+    def update(*args, **kwargs):
+        pool = reviewers._CredentialPool([("a", "x"), ("b", "y")], "http://x")
+        pool.members[0].sent, pool.members[1].sent = 3, 4
+        reviewers._transport = pool
+        return sample_cached_data
+
+    with patch.object(reviewers, "incremental_update", side_effect=update):
+        reviewers.main(["--output", str(tmp_path), "owner/repo"])
+
+    assert "Requests per credential: a: 3, b: 4" in capsys.readouterr().out
+
+
+@patch.object(reviewers, "webbrowser")
+@patch.object(reviewers, "generate_output")
+def test_main_offline(mock_output, mock_wb, sample_cached_data, tmp_path, capsys):
+    """--offline needs no token and serves requests from the response cache."""
+    _write_cache(tmp_path, sample_cached_data)
+
+    def update(*args, **kwargs):
+        assert reviewers._response_cache.offline
+        reviewers._response_cache.hits = 12
+        return sample_cached_data
+
+    with (
+        patch.object(reviewers, "configure_transport") as mock_transport,
+        patch.object(reviewers, "incremental_update", side_effect=update),
+        patch.object(reviewers._ResponseCache, "evict") as mock_evict,
+    ):
+        reviewers.main(["--output", str(tmp_path), "--offline", "owner/repo"])
+
+    mock_transport.assert_not_called()
+    mock_evict.assert_not_called()
+    # Kept out of --output, which the pages workflow publishes.
+    assert reviewers._response_cache.directory == str(
+        tmp_path / "user-cache" / "gh-reviewers-graph" / "responses"
+    )
+    assert "12 responses served from the response cache" in capsys.readouterr().out
+
+
 # --- _prev_month tests ---
 
 
@@ -276,6 +416,16 @@ def test_prev_month_january_wraps_to_december():
 # --- incremental_update() unit tests ---
 
 
+def _discovers(logins, merges):
+    """Stand-in for discover_reviewers() that reports its scan's merge tallies."""
+
+    def discover(*args, **kwargs):
+        kwargs["merges"].update(merges)
+        return logins
+
+    return discover
+
+
 @patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
 @patch.object(reviewers, "datetime")
 @patch.object(reviewers, "fetch_merge_counts")
@@ -321,7 +471,10 @@ def test_incremental_update_existing_reviewers(
         },
     }
 
-    mock_disc.return_value = ["alice"]
+    # Discovery rescans every month; only the stale ones' merges are used.
+    mock_disc.side_effect = _discovers(
+        ["alice"], {"alice": {"2024-01": 9, "2024-05": 1}}
+    )
     mock_rpc.return_value = {"alice": {"1": {"reviewed": 3, "commented": 1}}}
     # Stale months: 2024-03 through 2024-05
     # fetch_monthly_counts returns (reviews, comments)
@@ -329,7 +482,6 @@ def test_incremental_update_existing_reviewers(
         {"alice": {"2024-03": 7, "2024-04": 4}},
         {"alice": {"2024-04": 2}},
     )
-    mock_merge.return_value = {"alice": {"2024-05": 1}}
 
     result = reviewers.incremental_update(cached, "owner", "repo", 100)
 
@@ -345,7 +497,8 @@ def test_incremental_update_existing_reviewers(
     # New months from stale fetch
     assert alice["monthly"]["2024-04"] == 4
     assert alice["comment_monthly"]["2024-04"] == 2
-    assert alice["merge_monthly"]["2024-05"] == 1
+    assert alice["merge_monthly"] == {"2024-02": 1, "2024-05": 1}
+    mock_merge.assert_not_called()
     # Sealed comment_monthly 2024-01 preserved, stale 2024-03 cleared (not in new data)
     assert alice["comment_monthly"]["2024-01"] == 2
     assert "2024-03" not in alice["comment_monthly"]
@@ -413,7 +566,9 @@ def test_incremental_update_new_reviewer(
         },
     }
 
-    mock_disc.return_value = ["alice", "charlie"]
+    mock_disc.side_effect = _discovers(
+        ["alice", "charlie"], {"charlie": {"2024-01": 2, "2024-05": 1}}
+    )
     mock_av.return_value = {"charlie": "https://a.com/charlie.png"}
     mock_rpc.return_value = {
         "alice": {"1": {"reviewed": 0, "commented": 0}},
@@ -434,13 +589,6 @@ def test_incremental_update_new_reviewer(
             {"charlie": {"2024-01": 1}},
         ),
     ]
-    mock_merge.side_effect = [
-        # Stale merge fetch
-        {"alice": {}, "charlie": {"2024-05": 1}},
-        # Historical merge fetch
-        {"charlie": {"2024-01": 2}},
-    ]
-
     result = reviewers.incremental_update(cached, "owner", "repo", 100)
 
     charlie = result["reviewers"]["charlie"]
@@ -455,6 +603,64 @@ def test_incremental_update_new_reviewer(
     assert charlie["merge_monthly"]["2024-05"] == 1
 
 
+@patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
+@patch.object(reviewers, "_review_source_report", return_value={"source": "x"})
+@patch.object(reviewers, "fetch_review_contributions")
+@patch.object(reviewers, "datetime")
+@patch.object(reviewers, "fetch_merge_counts")
+@patch.object(reviewers, "fetch_monthly_counts")
+@patch.object(reviewers, "fetch_reviewer_period_counts")
+@patch.object(reviewers, "fetch_avatars")
+@patch.object(reviewers, "discover_reviewers")
+@patch.object(reviewers, "fetch_repo_activity")
+def test_incremental_update_new_reviewer_contributions(
+    mock_activity,
+    mock_disc,
+    mock_av,
+    mock_rpc,
+    mock_mc,
+    mock_merge,
+    mock_dt,
+    mock_contrib,
+    mock_report,
+    mock_rl,
+):
+    """With --review-source contributions a new reviewer's history is read too."""
+    from datetime import datetime, timezone
+
+    reviewers.configure_review_source("contributions")
+    mock_dt.now.return_value = datetime(2024, 5, 15, tzinfo=timezone.utc)
+    mock_activity.return_value = {
+        "last_pr_updated_at": "2024-05-15T00:00:00Z",
+        "total_pr_count": 200,
+    }
+    cached = {
+        "version": 8,
+        "start_month": "2024-01",
+        "end_month": "2024-03",
+        "review_counts": {"source": "contributions"},
+        "reviewers": {
+            "alice": {"monthly": {"2024-01": 10}, "comment_monthly": {}},
+        },
+    }
+    mock_disc.side_effect = _discovers(["alice", "charlie"], {})
+    mock_av.return_value = {}
+    mock_rpc.return_value = {}
+    mock_mc.return_value = ({}, {})
+
+    def contributions(owner, name, logins, month_ranges):
+        if month_ranges[0][0] == "2024-01":  # charlie's history
+            return {"charlie": {"2024-01": 5}}, {"charlie": 1}
+        return {login: {"2024-04": 3} for login in logins}, {}
+
+    mock_contrib.side_effect = contributions
+    result = reviewers.incremental_update(cached, "owner", "repo", 100)
+
+    assert result["reviewers"]["charlie"]["monthly"] == {"2024-01": 5, "2024-04": 3}
+    assert result["reviewers"]["alice"]["monthly"] == {"2024-01": 10, "2024-04": 3}
+    assert mock_report.call_args[0][3] == {"charlie": 1}
+
+
 @patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
 @patch.object(reviewers, "_scrape_fallback_period_counts")
 @patch.object(reviewers, "datetime")
@@ -568,7 +774,7 @@ def test_incremental_update_new_reviewer_no_historical(
         "reviewers": {},
     }
 
-    mock_disc.return_value = ["dave"]
+    mock_disc.side_effect = _discovers(["dave"], {})
     mock_av.return_value = {"dave": "https://a.com/dave.png"}
     mock_rpc.return_value = {"dave": {"1": {"reviewed": 3, "commented": 0}}}
     # Only stale fetch (2024-01 to 2024-03), no historical
@@ -576,7 +782,6 @@ def test_incremental_update_new_reviewer_no_historical(
         {"dave": {"2024-02": 3}},
         {"dave": {}},
     )
-    mock_merge.return_value = {"dave": {}}
 
     result = reviewers.incremental_update(cached, "owner", "repo", 100)
 
@@ -585,7 +790,7 @@ def test_incremental_update_new_reviewer_no_historical(
     assert dave["avatar_url"] == "https://a.com/dave.png"
     # fetch_monthly_counts called only once (stale), not twice
     assert mock_mc.call_count == 1
-    assert mock_merge.call_count == 1
+    mock_merge.assert_not_called()
 
 
 # --- activity-check skip-logic tests ---
@@ -771,6 +976,255 @@ def test_incremental_update_skip_discovery(
     assert result["activity"] == new_activity
 
 
+@patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
+@patch.object(reviewers, "fetch_late_activity_months", return_value=set())
+@patch.object(reviewers, "datetime")
+@patch.object(reviewers, "probe_reviewer_changes", return_value={"bob"})
+@patch.object(reviewers, "fetch_merge_counts", return_value={})
+@patch.object(reviewers, "fetch_monthly_counts")
+@patch.object(reviewers, "fetch_reviewer_period_counts")
+@patch.object(reviewers, "fetch_repo_activity")
+def test_incremental_update_keeps_quiet_reviewers(
+    mock_activity,
+    mock_rpc,
+    mock_mc,
+    mock_merge,
+    mock_probe,
+    mock_dt,
+    mock_late,
+    mock_rl,
+):
+    """Reviewers the change probe finds untouched keep their stale months."""
+    from datetime import datetime, timezone
+
+    mock_dt.now.return_value = datetime(2024, 5, 15, tzinfo=timezone.utc)
+    mock_dt.fromisoformat = datetime.fromisoformat
+    totals = {"all": {"reviewed": 70, "commented": 40, "merged": 50}}
+    mock_activity.return_value = {
+        "last_pr_updated_at": "2024-05-10T09:00:00Z",
+        "total_pr_count": 100,  # unchanged: reuse the reviewer list
+        "total_merged_prs": 50,
+        "repo_totals": {"all": {"reviewed": 71, "commented": 40, "merged": 50}},
+    }
+
+    def reviewer(monthly):
+        return {
+            "avatar_url": "https://a.com/x.png",
+            "monthly": monthly,
+            "comment_monthly": {},
+            "merge_monthly": {},
+        }
+
+    cached = {
+        "version": 8,
+        "start_month": "2024-01",
+        "end_month": "2024-04",
+        "fetched_at": "2024-05-01T00:00:00Z",
+        "activity": {
+            "last_pr_updated_at": "2024-04-30T09:00:00Z",
+            "total_pr_count": 100,
+            "total_merged_prs": 50,
+            "repo_totals": totals,
+        },
+        "reviewers": {
+            "alice": reviewer({"2024-01": 3, "2024-04": 2}),
+            "bob": reviewer({"2024-04": 1}),
+            "carol": reviewer({}),  # unsearchable: the probe cannot see them
+        },
+        "reviewer_period_counts": {
+            "alice": {"1": {"reviewed": 2, "commented": 0}},
+        },
+    }
+    mock_mc.return_value = ({"bob": {"2024-04": 2}, "carol": {}}, {})
+    mock_rpc.return_value = {}
+
+    result = reviewers.incremental_update(cached, "owner", "repo", 100)
+
+    assert mock_probe.call_args[0][2] == ["alice", "bob"]
+    assert mock_probe.call_args[0][3] == "2024-05-01T00:00:00Z"
+    assert mock_mc.call_args[0][2] == ["bob", "carol"]
+    # alice's window cutoff moved, so only her zero count is reused.
+    assert mock_rpc.call_args[0][4] == {"alice": {"1": {"commented": 0}}}
+    assert result["reviewers"]["alice"]["monthly"] == {"2024-01": 3, "2024-04": 2}
+    assert result["reviewers"]["bob"]["monthly"] == {"2024-04": 2}
+    assert result["fetched_at"] == "2024-05-15T00:00:00Z"
+
+
+@patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
+@patch.object(reviewers, "fetch_late_activity_months", return_value={"2024-01"})
+@patch.object(reviewers, "datetime")
+@patch.object(reviewers, "probe_reviewer_changes", return_value={"alice"})
+@patch.object(reviewers, "fetch_merge_counts")
+@patch.object(reviewers, "fetch_monthly_counts")
+@patch.object(reviewers, "fetch_reviewer_period_counts", return_value={})
+@patch.object(reviewers, "fetch_repo_activity")
+def test_incremental_update_recounts_late_activity(
+    mock_activity,
+    mock_rpc,
+    mock_mc,
+    mock_merge,
+    mock_probe,
+    mock_dt,
+    mock_late,
+    mock_rl,
+    tmp_path,
+):
+    """Sealed months with PRs updated since the last run are recounted."""
+    from datetime import datetime, timezone
+
+    mock_dt.now.return_value = datetime(2024, 5, 15, tzinfo=timezone.utc)
+    mock_dt.fromisoformat = datetime.fromisoformat
+    directory = str(tmp_path / "responses")
+    january = 'q0: search(query: "repo:o/r created:2024-01-01..2024-01-31") { n }'
+    reviewers._ResponseCache(directory).put(january, None, {"q0": {"n": 3}})
+    cache = reviewers.configure_response_cache(directory)
+    assert cache.get(january) == {"q0": {"n": 3}}
+    mock_activity.return_value = {
+        "last_pr_updated_at": "2024-05-10T09:00:00Z",
+        "total_pr_count": 100,
+        "total_merged_prs": 51,  # a January PR was merged late
+        "repo_totals": {"all": {"reviewed": 71, "commented": 40, "merged": 51}},
+    }
+    cached = {
+        "version": 8,
+        "start_month": "2024-01",
+        "end_month": "2024-04",
+        "fetched_at": "2024-05-01T00:00:00Z",
+        "activity": {
+            "last_pr_updated_at": "2024-04-30T09:00:00Z",
+            "total_pr_count": 100,
+            "total_merged_prs": 50,
+            "repo_totals": {"all": {"reviewed": 70, "commented": 40, "merged": 50}},
+        },
+        "reviewers": {
+            login: {
+                "avatar_url": "https://a.com/x.png",
+                "monthly": {"2024-01": 3, "2024-02": 1},
+                "comment_monthly": {},
+                "merge_monthly": {"2024-01": 1},
+            }
+            for login in ("alice", "bob")
+        },
+        "reviewer_period_counts": {},
+    }
+
+    def monthly_counts(owner, name, logins, month_ranges, *args):
+        labels = [label for label, _, _ in month_ranges]
+        return {login: {label: 4 for label in labels} for login in logins}, {}
+
+    mock_mc.side_effect = monthly_counts
+    mock_merge.side_effect = lambda owner, name, logins, month_ranges: {
+        login: {label: 2 for label, _, _ in month_ranges} for login in logins
+    }
+
+    result = reviewers.incremental_update(cached, "owner", "repo", 100)
+
+    assert mock_late.call_args[0][2] == "2024-05-01T00:00:00Z"
+    sealed = [label for label, _, _ in mock_late.call_args[0][3]]
+    assert sealed == ["2024-01", "2024-02", "2024-03"]
+    alice, bob = result["reviewers"]["alice"], result["reviewers"]["bob"]
+    # alice changed: January is recounted, February kept.
+    assert alice["monthly"] == {"2024-01": 4, "2024-02": 1, "2024-04": 4, "2024-05": 4}
+    # bob is quiet: review counts stay put, but merges are rescanned.
+    assert bob["monthly"] == {"2024-01": 3, "2024-02": 1}
+    assert bob["merge_monthly"] == {"2024-01": 2, "2024-04": 2, "2024-05": 2}
+    # Cached January answers are re-fetched, not replayed, by this run.
+    assert cache.get(january) is None
+
+
+@patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
+@patch.object(reviewers, "datetime")
+@patch.object(reviewers, "fetch_merge_counts", return_value={})
+@patch.object(reviewers, "fetch_monthly_counts", return_value=({}, {}))
+@patch.object(reviewers, "fetch_reviewer_period_counts", return_value={})
+@patch.object(reviewers, "discover_reviewers")
+@patch.object(reviewers, "fetch_repo_activity")
+def test_incremental_update_resumes_cached_discovery(
+    mock_activity, mock_disc, mock_rpc, mock_mc, mock_merge, mock_dt, mock_rl
+):
+    """Discovery continues from the cached state and the result caches it."""
+    from datetime import datetime, timezone
+
+    mock_dt.now.return_value = datetime(2024, 5, 15, tzinfo=timezone.utc)
+    mock_activity.return_value = {
+        "last_pr_updated_at": "2024-05-15T00:00:00Z",
+        "total_pr_count": 200,
+        "total_merged_prs": 100,
+        "repo_totals": {"all": {"reviewed": 150, "commented": 80, "merged": 100}},
+    }
+    discovery = {"end_month": "2024-03", "months": {}, "scores": {"alice": 4}}
+    cached = {
+        "version": 8,
+        "start_month": "2024-01",
+        "end_month": "2024-03",
+        "reviewers": {},
+        "discovery": discovery,
+    }
+
+    def discover(*args, state, **kwargs):
+        assert state == discovery and state is not discovery
+        state["end_month"] = "2024-05"
+        return []
+
+    mock_disc.side_effect = discover
+    result = reviewers.incremental_update(cached, "owner", "repo", 100)
+
+    assert result["discovery"]["end_month"] == "2024-05"
+    assert cached["discovery"]["end_month"] == "2024-03"
+
+
+@patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
+@patch.object(reviewers, "datetime")
+@patch.object(reviewers, "fetch_merge_counts")
+@patch.object(reviewers, "fetch_monthly_counts", return_value=({}, {}))
+@patch.object(reviewers, "fetch_reviewer_period_counts", return_value={})
+@patch.object(reviewers, "fetch_avatars", return_value={})
+@patch.object(reviewers, "discover_reviewers")
+@patch.object(reviewers, "fetch_repo_activity")
+def test_incremental_update_stale_merges_from_discovery_scan(
+    mock_activity, mock_disc, mock_av, mock_rpc, mock_mc, mock_merge, mock_dt, mock_rl
+):
+    """Incremental discovery's scan gives stale-month merges; only a new
+    reviewer's history is still fetched."""
+    from datetime import datetime, timezone
+
+    mock_dt.now.return_value = datetime(2024, 5, 15, tzinfo=timezone.utc)
+    mock_activity.return_value = {
+        "last_pr_updated_at": "2024-05-15T00:00:00Z",
+        "total_pr_count": 200,
+        "total_merged_prs": 100,
+        "repo_totals": {"all": {"reviewed": 150, "commented": 80, "merged": 100}},
+    }
+    cached = {
+        "version": 8,
+        "start_month": "2024-01",
+        "end_month": "2024-03",
+        "reviewers": {
+            "alice": {
+                "avatar_url": "https://a.com/alice.png",
+                "monthly": {},
+                "comment_monthly": {},
+                "merge_monthly": {"2024-01": 4},
+            },
+        },
+        "discovery": {"end_month": "2024-03", "months": {}, "scores": {}},
+    }
+    mock_disc.side_effect = _discovers(
+        ["alice", "charlie"], {"alice": {"2024-04": 1}, "charlie": {"2024-03": 2}}
+    )
+    mock_merge.return_value = {"charlie": {"2024-02": 5}}
+
+    result = reviewers.incremental_update(cached, "owner", "repo", 100)
+
+    assert result["reviewers"]["alice"]["merge_monthly"] == {"2024-01": 4, "2024-04": 1}
+    assert result["reviewers"]["charlie"]["merge_monthly"] == {
+        "2024-02": 5,
+        "2024-03": 2,
+    }
+    mock_merge.assert_called_once()
+    assert mock_merge.call_args.args[2] == ["charlie"]
+
+
 @patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
 @patch.object(reviewers, "datetime")
 @patch.object(reviewers, "fetch_monthly_counts")
@@ -901,16 +1355,111 @@ def test_incremental_update_no_cached_activity(
         },
     }
 
-    mock_disc.return_value = ["alice"]
+    mock_disc.side_effect = _discovers(["alice"], {"alice": {"2024-04": 2}})
     mock_rpc.return_value = {"alice": {"1": {"reviewed": 0, "commented": 0}}}
     mock_mc.return_value = ({"alice": {}}, {"alice": {}})
-    mock_merge.return_value = {"alice": {}}
 
     result = reviewers.incremental_update(cached, "owner", "repo", 100)
 
     # Full update path: discover was called
     mock_disc.assert_called_once()
-    # Merge counts were fetched (no skip)
-    mock_merge.assert_called_once()
+    # Merge counts were refreshed (no skip), from discovery's scan
+    assert result["reviewers"]["alice"]["merge_monthly"] == {"2024-04": 2}
     # Activity now stored
     assert result["activity"] == mock_activity.return_value
+
+
+# --- per-repo lock ---
+
+
+def _hold_lock(owner, name):
+    """Take the repo lock the way another run would (a separate open file)."""
+    path = reviewers._repo_lock_path(owner, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lock = open(path, "a")
+    reviewers.fcntl.flock(lock, reviewers.fcntl.LOCK_EX)
+    return lock
+
+
+def test_repo_lock_uncontended(tmp_path):
+    with reviewers._repo_lock("o", "r") as waited:
+        assert waited is False
+    lock_path = tmp_path / "user-cache" / "gh-reviewers-graph" / "locks" / "o__r.lock"
+    assert lock_path.exists()
+
+
+def test_repo_lock_without_fcntl(tmp_path, monkeypatch):
+    """Where flock is unavailable no lock is taken and nothing waits."""
+    monkeypatch.setattr(reviewers, "fcntl", None)
+    with reviewers._repo_lock("o", "r", wait=False) as waited:
+        assert waited is False
+    assert not os.path.exists(reviewers._repo_lock_path("o", "r"))
+
+
+def test_repo_lock_waits_for_other_run(tmp_path, capsys):
+    lock = _hold_lock("o", "r")
+    timer = threading.Timer(0.2, lock.close)
+    timer.start()
+    with reviewers._repo_lock("o", "r") as waited:
+        assert waited is True
+        assert lock.closed
+    timer.join()
+    assert "waiting for it to finish" in capsys.readouterr().out
+
+
+def test_repo_lock_no_wait_fails_fast(tmp_path):
+    lock = _hold_lock("o", "r")
+    try:
+        with (
+            pytest.raises(SystemExit, match="another run is updating o/r"),
+            reviewers._repo_lock("o", "r", wait=False),
+        ):
+            pass
+    finally:
+        lock.close()
+
+
+def test_main_no_wait_while_locked(tmp_path):
+    lock = _hold_lock("owner", "repo")
+    try:
+        with (
+            patch.object(reviewers, "_update_and_render") as mock_update,
+            pytest.raises(SystemExit, match="another run is updating"),
+        ):
+            reviewers.main(
+                ["--output", str(tmp_path), "--offline", "--no-wait", "owner/repo"]
+            )
+    finally:
+        lock.close()
+    mock_update.assert_not_called()
+
+
+@patch.object(reviewers, "webbrowser")
+@patch.object(reviewers, "generate_output")
+def test_main_lock_kept_out_of_output(
+    mock_output, mock_wb, sample_cached_data, tmp_path
+):
+    """--output is published (e.g. to GitHub Pages), so the lock lives elsewhere."""
+    output = tmp_path / "out"
+    _write_cache(output, sample_cached_data)
+    before = sorted(output.rglob("*"))
+    with patch.object(reviewers, "incremental_update", return_value=sample_cached_data):
+        reviewers.main(["--output", str(output), "--offline", "owner/repo"])
+    assert sorted(output.rglob("*")) == before
+    assert os.path.exists(reviewers._repo_lock_path("owner", "repo"))
+
+
+def test_main_reuses_cache_written_while_waiting(tmp_path, capsys):
+    """After waiting, --refresh is dropped: the other run just fetched."""
+    seen = []
+    with (
+        patch.object(reviewers, "_repo_lock") as mock_lock,
+        patch.object(
+            reviewers, "_update_and_render", side_effect=lambda a, e: seen.append(a)
+        ),
+    ):
+        mock_lock.return_value.__enter__.return_value = True
+        reviewers.main(["--output", str(tmp_path), "--offline", "--refresh", "o/r"])
+    assert seen[0].refresh is False
+    assert reviewers._response_cache.refresh is False
+    assert "ignoring --refresh" in capsys.readouterr().out
@@ -1,11 +1,17 @@
 # tests/test_rate_limit.py
-"""Tests for rate limit estimation, budget check, and countdown."""
+"""Tests for rate limit state, estimation, budget check, pacing, backoff, and countdown."""
 
+import importlib.machinery
+import importlib.util
 import json
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from conftest import reviewers
 
 
@@ -59,15 +65,16 @@ def test_get_rate_limit_info_bad_json():
 def test_estimate_api_calls_small_repo():
     """12 months, 20 reviewers produces a reasonable estimate."""
     result = reviewers.estimate_api_calls(12, 20)
-    # Should be roughly: 2 + 12 + ceil(36*2/25) + ceil(20/15) + ceil(480/25) + 12 + ceil(200/25)
-    # = 2 + 12 + 3 + 2 + 20 + 12 + 8 = 59
+    # Should be roughly:
+    # 2 + 12 + ceil(36*2/25) + ceil(20/15) + ceil(480/25) + ceil(200/25)
+    # = 2 + 12 + 3 + 2 + 20 + 8 = 47
     assert 40 < result < 100
 
 
 def test_estimate_api_calls_large_repo():
-    """155 months, 100 reviewers matches the plan's ~1637 estimate."""
+    """155 months, 100 reviewers: the plan's ~1637, less one merge scan per month."""
     result = reviewers.estimate_api_calls(155, 100)
-    assert 1500 < result < 1800
+    assert 1400 < result < 1650
 
 
 def test_estimate_api_calls_scales_with_months():
@@ -77,6 +84,23 @@ def test_estimate_api_calls_scales_with_months():
     assert large > small
 
 
+def test_estimate_api_calls_scales_with_prs():
+    """Discovery's PR scan costs a page per 100 PRs beyond a page per month."""
+    assert reviewers._estimate_scan_calls(12, 0) == 12
+    assert reviewers._estimate_scan_calls(12, 5_000) == 62
+    few = reviewers.estimate_api_calls(12, 20, 100)
+    many = reviewers.estimate_api_calls(12, 20, 10_000)
+    assert many - few == 99
+
+
+def test_estimate_ranking_calls():
+    """With --prune, ranking is costed for about twice the kept reviewers."""
+    assert reviewers._estimate_ranking_calls(155, 10) == 38  # 465 candidates
+    reviewers.configure_discovery_pruning(True)
+    assert reviewers._estimate_ranking_calls(155, 10) == 2  # 20 candidates
+    assert reviewers._estimate_ranking_calls(2, 100) == 1  # only 6 candidates
+
+
 # --- estimate_incremental_calls ---
 
 
@@ -87,6 +111,24 @@ def test_estimate_incremental_calls():
     assert incremental < full
 
 
+def test_estimate_incremental_calls_counts_probe_savings():
+    """The probe costs a little; quiet reviewers save their refetches."""
+    unprobed = reviewers.estimate_incremental_calls(100, 2, 120, True)
+    probed = reviewers.estimate_incremental_calls(100, 2, 120, True, 0, 100, 0)
+    quiet = reviewers.estimate_incremental_calls(100, 2, 120, True, 0, 100, 80)
+    assert probed - unprobed == 8
+    assert quiet < unprobed
+
+
+def test_estimate_incremental_calls_counts_late_months():
+    """Late months cost scans plus a recount, far less than a refresh."""
+    base = reviewers.estimate_incremental_calls(100, 2, 120, True)
+    late = reviewers.estimate_incremental_calls(100, 2, 120, True, 0, 0, 0, 6)
+    # The scan, merge rescans, recounts, and discovery's rescans.
+    assert late - base == 1 + 6 + 48 + 6
+    assert late < reviewers.estimate_api_calls(120, 100)
+
+
 def test_estimate_incremental_calls_scales_with_stale():
     """More stale months means more calls."""
     few = reviewers.estimate_incremental_calls(50, 2, 120)
@@ -250,3 +292,528 @@ def test_wait_for_rate_limit_reset_reuses_cached_target(mock_dt, mock_info, mock
     reviewers._wait_for_rate_limit_reset()
     assert mock_info.call_count == 1  # still 1, not 2
     assert mock_sleep.call_count >= 1
+
+
+# --- _RateLimitState ---
+
+
+def _reset_in(seconds):
+    reset = datetime.now(timezone.utc) + timedelta(seconds=seconds)
+    return reset.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def test_state_observes_response():
+    state = reviewers._RateLimitState()
+    state.observe_response({"remaining": 4000, "resetAt": "2099-01-01T00:00:00Z"})
+    assert state.snapshot() == (4000, datetime(2099, 1, 1, tzinfo=timezone.utc))
+
+
+def test_state_keeps_lowest_remaining_in_window():
+    """Out-of-order responses cannot raise remaining within one window."""
+    state = reviewers._RateLimitState()
+    state.observe_response({"remaining": 3000, "resetAt": "2099-01-01T00:00:00Z"})
+    state.observe_response({"remaining": 3005, "resetAt": "2099-01-01T00:00:00Z"})
+    assert state.remaining == 3000
+    # A new window replaces the old one.
+    state.observe_response({"remaining": 4999, "resetAt": "2099-01-01T01:00:00Z"})
+    assert state.remaining == 4999
+
+
+def test_state_ignores_late_response_from_old_window():
+    """A response from a window that has since reset cannot bring it back."""
+    state = reviewers._RateLimitState()
+    state.shared = MagicMock()
+    state.observe_response({"remaining": 4999, "resetAt": "2099-01-01T01:00:00Z"})
+    state.observe_response({"remaining": 12, "resetAt": "2099-01-01T00:00:00Z"})
+    assert state.remaining == 4999
+    assert state.reset_at == datetime(2099, 1, 1, 1, tzinfo=timezone.utc)
+    assert state.shared.observe.call_count == 1
+
+
+def test_state_ignores_incomplete_response():
+    state = reviewers._RateLimitState()
+    state.observe_response(None)
+    state.observe_response({"remaining": "?"})
+    assert state.snapshot() == (None, None)
+    state.observe_response({"remaining": 10, "resetAt": ""})
+    assert state.snapshot() == (10, None)
+
+
+def test_state_observes_headers():
+    state = reviewers._RateLimitState()
+    state.observe_headers(
+        {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": "4321",
+            "X-RateLimit-Reset": "4070908800",
+            "X-RateLimit-Resource": "graphql",
+        }
+    )
+    assert state.snapshot() == (4321, datetime(2099, 1, 1, tzinfo=timezone.utc))
+    assert state.limit == 5000
+
+
+def test_state_ignores_other_headers():
+    state = reviewers._RateLimitState()
+    state.observe_headers(
+        {"X-RateLimit-Resource": "core", "X-RateLimit-Remaining": "1"}
+    )
+    state.observe_headers({"X-RateLimit-Remaining": "1"})
+    assert state.snapshot() == (None, None)
+
+
+def test_state_expired_window_is_unknown():
+    state = reviewers._RateLimitState()
+    state.observe_response({"remaining": 0, "resetAt": "2000-01-01T00:00:00Z"})
+    assert state.snapshot() == (None, None)
+
+
+@patch.object(reviewers, "get_rate_limit_info")
+def test_state_probes_only_on_cold_start(mock_info):
+    reset = datetime(2099, 1, 1, tzinfo=timezone.utc)
+    mock_info.return_value = (1234, reset)
+    state = reviewers._RateLimitState()
+    assert state.current() == (1234, reset)
+    assert state.current() == (1234, reset)
+    mock_info.assert_called_once()
+
+
+@patch.object(reviewers, "get_rate_limit_info")
+def test_state_no_probe_after_response(mock_info):
+    state = reviewers._RateLimitState()
+    state.observe_response({"remaining": 4000, "resetAt": "2099-01-01T00:00:00Z"})
+    assert state.current()[0] == 4000
+    mock_info.assert_not_called()
+
+
+@patch.object(reviewers, "get_rate_limit_info", return_value=(None, None))
+def test_state_probe_failure(mock_info):
+    assert reviewers._RateLimitState().current() == (None, None)
+
+
+@patch.object(reviewers, "get_rate_limit_info")
+def test_state_concurrent_cold_start_probes_once(mock_info):
+    reset = datetime(2099, 1, 1, tzinfo=timezone.utc)
+    mock_info.return_value = (1234, reset)
+    state = reviewers._RateLimitState()
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: state.current(), range(16)))
+    assert results == [(1234, reset)] * 16
+    mock_info.assert_called_once()
+
+
+@patch.object(reviewers, "get_rate_limit_info")
+def test_budget_check_reads_observed_state(mock_info, capsys):
+    reviewers._rate_limit.observe_headers(
+        {
+            "X-RateLimit-Limit": "12500",
+            "X-RateLimit-Remaining": "9000",
+            "X-RateLimit-Reset": "4070908800",
+        }
+    )
+    reviewers.check_rate_limit_budget(900)
+    assert "9,000 of 12,500 remaining" in capsys.readouterr().out
+    mock_info.assert_not_called()
+
+
+@patch("time.sleep", side_effect=StopIteration)
+@patch.object(reviewers, "get_rate_limit_info")
+def test_wait_uses_observed_reset(mock_info, mock_sleep):
+    """The countdown targets the observed resetAt without a REST probe."""
+    reviewers._rate_limit.observe_response({"remaining": 0, "resetAt": _reset_in(20)})
+    with pytest.raises(StopIteration):
+        reviewers._wait_for_rate_limit_reset()
+    mock_info.assert_not_called()
+    mock_sleep.assert_called_once_with(15)
+
+
+# --- _QuotaPacer ---
+
+
+@pytest.fixture
+def pacer_state():
+    return reviewers._RateLimitState()
+
+
+def test_pacer_tracks_average_cost(pacer_state):
+    pacer = reviewers._QuotaPacer(pacer_state)
+    for _ in range(50):
+        pacer.record({"cost": 3})
+    assert pacer.cost == pytest.approx(3, abs=0.01)
+
+
+def test_pacer_counts_requests_without_rate_limit(pacer_state):
+    pacer = reviewers._QuotaPacer(pacer_state)
+    pacer.plan(5)
+    pacer.record(None)
+    pacer.record({"remaining": "?"})
+    assert pacer.pending == 3
+    assert pacer.cost == 1.0
+
+
+def test_pacer_plan_excludes_sent_requests(pacer_state):
+    pacer = reviewers._QuotaPacer(pacer_state)
+    for _ in range(10):
+        pacer.record({})
+    pacer.plan(100)
+    assert pacer.pending == 90
+    pacer.plan(5)
+    assert pacer.pending == 0
+
+
+def test_pacer_defaults_to_shared_state():
+    assert reviewers._QuotaPacer().state is reviewers._rate_limit
+
+
+def test_pacer_no_pacing_when_demand_fits(pacer_state):
+    pacer = reviewers._QuotaPacer(pacer_state)
+    pacer_state.observe_response({"remaining": 4000, "resetAt": _reset_in(3600)})
+    pacer.plan(1000)
+    assert pacer.interval() == 0
+
+
+def test_pacer_spreads_over_window(pacer_state):
+    """Remaining points minus the reserve are spread until resetAt."""
+    pacer = reviewers._QuotaPacer(pacer_state)
+    pacer_state.observe_response({"remaining": 1050, "resetAt": _reset_in(1000)})
+    pacer.plan(2000)
+    assert pacer.interval() == pytest.approx(1.0, abs=0.01)
+
+
+def test_pacer_leaves_exhausted_budget_to_hard_stop(pacer_state):
+    pacer = reviewers._QuotaPacer(pacer_state)
+    pacer_state.observe_response({"remaining": 10, "resetAt": _reset_in(1000)})
+    pacer.plan(2000)
+    assert pacer.interval() == 0
+
+
+@patch("time.sleep")
+def test_pacer_wait_assigns_slots(mock_sleep, pacer_state):
+    pacer = reviewers._QuotaPacer(pacer_state)
+    pacer_state.observe_response({"remaining": 1050, "resetAt": _reset_in(1000)})
+    pacer.plan(2000)
+    pacer.wait()
+    pacer.wait()
+    pacer.wait()
+    # The first request goes at once; the others wait for their slots.
+    assert mock_sleep.call_count == 2
+    assert mock_sleep.call_args_list[1][0][0] > mock_sleep.call_args_list[0][0][0]
+
+
+@patch("time.sleep")
+def test_pacer_wait_unpaced(mock_sleep, pacer_state):
+    reviewers._QuotaPacer(pacer_state).wait()
+    mock_sleep.assert_not_called()
+
+
+@patch("time.monotonic")
+def test_pacer_eta(mock_monotonic, pacer_state):
+    pacer = reviewers._QuotaPacer(pacer_state)
+    pacer.plan(12)
+    assert pacer.eta() is None
+    assert pacer.eta_text() == ""
+    mock_monotonic.side_effect = [0.0, 1.0, 2.0]
+    for _ in range(3):
+        pacer.record({})
+    # 2 requests per 2s, 9 pending
+    assert pacer.eta() == pytest.approx(9.0)
+    assert pacer.eta_text() == " (ETA 0m 09s)"
+
+
+@patch("time.monotonic", return_value=5.0)
+def test_pacer_eta_needs_elapsed_time(mock_monotonic, pacer_state):
+    pacer = reviewers._QuotaPacer(pacer_state)
+    pacer.plan(12)
+    pacer.record({})
+    pacer.record({})
+    assert pacer.eta() is None
+
+
+@patch("time.sleep")
+def test_graphql_request_feeds_rate_limit_state(mock_sleep):
+    reviewers._pacer.plan(3)
+    response = {
+        "data": {
+            "rateLimit": {"cost": 1, "remaining": 4321, "resetAt": _reset_in(600)},
+            "ok": True,
+        }
+    }
+    with patch.object(reviewers, "_gh_graphql_post", return_value=response):
+        reviewers._graphql_request("query { }")
+    assert reviewers._rate_limit.remaining == 4321
+    assert reviewers._pacer.pending == 2
+
+
+# --- secondary rate limits ---
+
+
+def test_is_secondary_rate_limit():
+    assert reviewers._is_secondary_rate_limit(
+        "You have exceeded a secondary rate limit."
+    )
+    assert reviewers._is_secondary_rate_limit("HTTP 403: abuse detection")
+    assert reviewers._is_secondary_rate_limit("HTTP 429: Too Many Requests")
+    assert reviewers._is_secondary_rate_limit("HTTP 403: Forbidden", retry_after=30)
+    assert not reviewers._is_secondary_rate_limit("HTTP 403: API rate limit exceeded")
+    assert not reviewers._is_secondary_rate_limit("HTTP 404: Not Found")
+
+
+@patch("time.sleep")
+def test_breaker_closed_does_not_wait(mock_sleep):
+    reviewers._CircuitBreaker().wait()
+    mock_sleep.assert_not_called()
+
+
+@patch("random.uniform", return_value=2.0)
+@patch("time.sleep")
+@patch("time.monotonic", return_value=100.0)
+def test_breaker_waits_retry_after_plus_jitter(mock_monotonic, mock_sleep, _):
+    breaker = reviewers._CircuitBreaker()
+    breaker.trip(30)
+    breaker.wait()
+    mock_sleep.assert_called_once_with(pytest.approx(32.0))
+    assert breaker.trips == 1
+
+
+@patch("time.monotonic", return_value=100.0)
+def test_breaker_default_backoff_and_longest_wins(mock_monotonic):
+    breaker = reviewers._CircuitBreaker()
+    breaker.trip()
+    assert breaker._open_until == 100.0 + reviewers.SECONDARY_LIMIT_BACKOFF
+    breaker.trip(5)
+    assert breaker._open_until == 100.0 + reviewers.SECONDARY_LIMIT_BACKOFF
+    assert breaker.trips == 2
+
+
+@patch("time.sleep")
+@patch.object(reviewers, "_wait_for_rate_limit_reset")
+def test_graphql_request_secondary_limit_trips_breaker(mock_wait, mock_sleep):
+    """Secondary limits use Retry-After, not the primary reset countdown."""
+    responses = [
+        reviewers._TransportError(
+            "gh api graphql", "HTTP 403: secondary rate limit", "", 7
+        ),
+        {"data": {"ok": True}},
+    ]
+
+    def post(query, variables=None):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    with patch.object(reviewers, "_gh_graphql_post", side_effect=post):
+        assert reviewers._graphql_request("query { }") == {"ok": True}
+    mock_wait.assert_not_called()
+    assert reviewers._breaker.trips == 1
+    delay = mock_sleep.call_args_list[0][0][0]
+    assert 6 < delay <= 7 + reviewers._breaker.jitter
+
+
+@patch("time.sleep")
+def test_breaker_pauses_other_workers(mock_sleep):
+    """Once tripped, every request waits before it is sent."""
+    reviewers._breaker.trip(10)
+    with patch.object(
+        reviewers, "_gh_graphql_post", return_value={"data": {"ok": True}}
+    ) as mock_post:
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda _: reviewers._graphql_request("query { }"), range(4)))
+    assert mock_post.call_count == 4
+    assert mock_sleep.call_count >= 4
+
+
+# --- _QuotaCoordinator ---
+
+
+def _run(path, pid, interval=0):
+    """A coordinator as seen from another run (process id) on the machine.
+
+    Unless an interval is given it exchanges state with the file on every
+    call.
+    """
+    coordinator = reviewers._QuotaCoordinator(str(path), interval)
+    coordinator._pid = pid
+    return coordinator
+
+
+@patch.object(reviewers, "get_rate_limit_info")
+def test_coordinator_shares_observations(mock_info, tmp_path):
+    """What one run observes, another run sees without probing."""
+    path = tmp_path / "quota" / "k.json"
+    first, second = reviewers._RateLimitState(), reviewers._RateLimitState()
+    first.shared, second.shared = _run(path, "1"), _run(path, "2")
+    first.observe_response({"remaining": 900, "resetAt": _reset_in(600)})
+    remaining, reset_at = second.current()
+    assert remaining == 900
+    assert reset_at == first.reset_at
+    mock_info.assert_not_called()
+
+
+def test_coordinator_keeps_lowest_in_newest_window(tmp_path):
+    coordinator = _run(tmp_path / "k.json", "1")
+    later = datetime.now(timezone.utc) + timedelta(seconds=600)
+    coordinator.observe(500, later)
+    coordinator.observe(700, later)
+    assert coordinator.snapshot() == (500, later)
+    # A late response from the previous window does not win.
+    coordinator.observe(10, later - timedelta(hours=1))
+    assert coordinator.snapshot() == (500, later)
+    coordinator.observe(4999, later + timedelta(hours=1))
+    assert coordinator.snapshot()[0] == 4999
+
+
+def test_fresher_prefers_newest_window():
+    fresher = reviewers._RateLimitState._fresher
+    assert fresher((None, None), (5, 100)) == (5, 100)
+    assert fresher((5, 100), (None, None)) == (5, 100)
+    assert fresher((5, 100), (3, 100)) == (3, 100)
+    assert fresher((5, None), (9, 100)) == (9, 100)
+    assert fresher((5, 100), (9, 200)) == (9, 200)
+    assert fresher((5, 200), (9, 100)) == (5, 200)
+    assert fresher((5, 200), (9, None)) == (5, 200)
+
+
+def test_coordinator_without_reset_time(tmp_path):
+    coordinator = _run(tmp_path / "k.json", "1")
+    assert coordinator.snapshot() == (None, None)
+    coordinator.observe(5, None)
+    assert coordinator.snapshot() == (5, None)
+
+
+def test_coordinator_batches_file_writes(tmp_path):
+    """Responses and spinner ticks within one interval write the file once."""
+    path = tmp_path / "k.json"
+    coordinator, other = _run(path, "1", interval=1.0), _run(path, "2")
+    reset = datetime.now(timezone.utc) + timedelta(seconds=600)
+    with patch.object(reviewers.os, "replace", wraps=reviewers.os.replace) as writes:
+        for remaining in range(900, 800, -1):
+            coordinator.observe(remaining, reset)
+            coordinator.pending(remaining)
+        assert writes.call_count == 1
+        # Buffered observations are still part of this run's own view.
+        assert coordinator.snapshot() == (801, reset)
+        assert other.snapshot() == (900, reset)
+        later = reviewers.time.time() + 1.0
+        with patch("time.time", return_value=later):
+            assert coordinator.pending(10) == 10
+        assert writes.call_count == 3
+    assert other.snapshot() == (801, reset)
+    coordinator.observe(5, reset)
+    coordinator.close()
+    assert other.snapshot() == (5, reset)
+    assert other.pending(1) == 1
+
+
+def test_state_merges_lower_shared_remaining(tmp_path):
+    """A run's own view is replaced by a lower count from another run."""
+    path = tmp_path / "k.json"
+    state = reviewers._RateLimitState()
+    state.observe_response({"remaining": 900, "resetAt": _reset_in(600)})
+    state.shared = _run(path, "1")
+    _run(path, "2").observe(300, state.reset_at)
+    assert state.snapshot() == (300, state.reset_at)
+
+
+def test_coordinator_sums_live_runs(tmp_path):
+    path = tmp_path / "k.json"
+    first, second = _run(path, "1"), _run(path, "2")
+    assert first.pending(100) == 100
+    assert second.pending(50) == 150
+    with patch("time.time", return_value=reviewers.time.time() + 1000):
+        # The other run went quiet long ago and no longer counts.
+        assert second.pending(50) == 50
+    second.close()
+    assert first.pending(100) == 100
+
+
+@patch("time.sleep")
+def test_pacer_shares_demand_and_slots(mock_sleep, tmp_path):
+    """Two runs pace for their combined demand and take turns."""
+    path = tmp_path / "k.json"
+    pacers = []
+    for pid in ("1", "2"):
+        state = reviewers._RateLimitState()
+        state.shared = _run(path, pid)
+        pacer = reviewers._QuotaPacer(state)
+        pacer.shared = state.shared
+        pacer.plan(1000)
+        pacers.append(pacer)
+    pacers[0].state.observe_response({"remaining": 1050, "resetAt": _reset_in(1000)})
+    # Alone, 1000 requests would fit in 1000 points; together they need 2000.
+    assert pacers[0].interval() == pytest.approx(1.0, abs=0.01)
+    pacers[0].wait()
+    pacers[1].wait()
+    mock_sleep.assert_called_once()
+    assert mock_sleep.call_args[0][0] == pytest.approx(1.0, abs=0.1)
+
+
+def test_coordinator_across_processes(tmp_path):
+    """A run in another process sees this one's observation through the file."""
+    path = tmp_path / "k.json"
+    reset = datetime.now(timezone.utc) + timedelta(seconds=600)
+    _run(path, "1").observe(1234, reset)
+    script = (
+        "import importlib.machinery, importlib.util, sys\n"
+        "loader = importlib.machinery.SourceFileLoader('r', sys.argv[1])\n"
+        "spec = importlib.util.spec_from_loader('r', loader)\n"
+        "r = importlib.util.module_from_spec(spec)\n"
+        "loader.exec_module(r)\n"
+        "print(r._QuotaCoordinator(sys.argv[2]).snapshot()[0])\n"
+    )
+    result = subprocess.run(
+        [reviewers.sys.executable, "-c", script, reviewers.__file__, str(path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "1234"
+
+
+def test_configure_quota_coordinator_keys_by_credential(tmp_path):
+    reviewers._transport = reviewers._NativeTransport("tok-a", "https://x/graphql")
+    first = reviewers.configure_quota_coordinator(str(tmp_path))
+    assert reviewers._rate_limit.shared is first
+    assert reviewers._pacer.shared is first
+    assert first.path.startswith(str(tmp_path / "quota"))
+    again = reviewers.configure_quota_coordinator(str(tmp_path))
+    reviewers._transport = reviewers._NativeTransport("tok-b", "https://x/graphql")
+    other = reviewers.configure_quota_coordinator(str(tmp_path))
+    assert again.path == first.path != other.path
+    assert "tok-a" not in first.path
+
+
+def test_configure_quota_coordinator_keys_pool_by_every_token(tmp_path):
+    reviewers._transport = reviewers._CredentialPool(
+        [("a", "tok-b"), ("b", "tok-a")], "https://x/graphql"
+    )
+    first = reviewers.configure_quota_coordinator(str(tmp_path))
+    reviewers._transport = reviewers._CredentialPool(
+        [("b", "tok-a"), ("a", "tok-b")], "https://x/graphql"
+    )
+    assert reviewers.configure_quota_coordinator(str(tmp_path)).path == first.path
+    reviewers._transport = reviewers._NativeTransport("tok-a", "https://x/graphql")
+    assert reviewers.configure_quota_coordinator(str(tmp_path)).path != first.path
+
+
+def test_no_coordinator_without_fcntl(monkeypatch):
+    monkeypatch.setattr(reviewers, "fcntl", None)
+    assert reviewers.configure_quota_coordinator() is None
+    assert reviewers._rate_limit.shared is None
+
+
+def test_script_imports_without_fcntl():
+    """Where fcntl is missing (Windows), the script still loads."""
+    loader = importlib.machinery.SourceFileLoader("no_fcntl", reviewers.__file__)
+    module = importlib.util.module_from_spec(
+        importlib.util.spec_from_loader(loader.name, loader)
+    )
+    with patch.dict(sys.modules, {"fcntl": None}), patch.object(sys, "exit"):
+        loader.exec_module(module)
+    assert module.fcntl is None
+
+
+def test_configure_quota_coordinator_defaults_to_user_cache(tmp_path):
+    reviewers._transport = reviewers._NativeTransport("tok", "https://x/graphql")
+    coordinator = reviewers.configure_quota_coordinator()
+    assert coordinator.path.startswith(str(tmp_path / "user-cache"))
@@ -210,3 +210,49 @@ def test_invalid_repo_totals_period_rejected(schema):
     }
     with pytest.raises(jsonschema.ValidationError):
         jsonschema.validate(data, schema)
+
+
+def test_review_counts_from_contributions_valid(schema, sample_cached_data):
+    """The optional review_counts report validates; other sources do not."""
+    data = dict(sample_cached_data)
+    data["review_counts"] = {
+        "source": "contributions",
+        "restricted_contributions": 3,
+        "reconciliation": {
+            "sampled": 2,
+            "matching": 1,
+            "mismatches": [
+                {"login": "alice", "month": "2024-01", "search": 2, "contributions": 1}
+            ],
+        },
+    }
+    jsonschema.validate(data, schema)
+    data["review_counts"] = dict(data["review_counts"], source="search")
+    with pytest.raises(jsonschema.ValidationError):
+        jsonschema.validate(data, schema)
+
+
+def test_fetched_at_valid(schema, sample_cached_data):
+    """The optional fetched_at timestamp validates; other formats do not."""
+    data = dict(sample_cached_data)
+    data["fetched_at"] = "2024-05-01T00:00:00Z"
+    jsonschema.validate(data, schema)
+    data["fetched_at"] = "2024-05-01"
+    with pytest.raises(jsonschema.ValidationError):
+        jsonschema.validate(data, schema)
+
+
+def test_discovery_state_valid(schema, sample_cached_data):
+    """The optional discovery state validates; month keys are checked."""
+    data = dict(sample_cached_data)
+    data["discovery"] = {
+        "end_month": "2024-03",
+        "months": {
+            "2024-03": {"appearances": {"alice": 2, "bob": 1}, "merges": {"bob": 1}}
+        },
+        "scores": {"alice": 12},
+    }
+    jsonschema.validate(data, schema)
+    data["discovery"]["months"]["March"] = {"appearances": {}, "merges": {}}
+    with pytest.raises(jsonschema.ValidationError):
+        jsonschema.validate(data, schema)
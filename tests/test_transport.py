@@ -0,0 +1,590 @@
+# tests/test_transport.py
+"""Tests for the native pooled HTTPS GraphQL transport."""
+
+import base64
+import gzip
+import json
+import select
+import socket
+import subprocess
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from conftest import reviewers
+
+
+class _GraphQLHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers["Content-Length"])
+        payload = json.loads(self.rfile.read(length))
+        server.requests.append(
+            {
+                "payload": payload,
+                "headers": dict(self.headers),
+                "peer": self.client_address,
+            }
+        )
+        status, body, *extra = (
+            server.responses.pop(0) if server.responses else (200, {})
+        )
+        raw = json.dumps(body).encode()
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            raw = gzip.compress(raw)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        for header, value in (extra[0] if extra else {}).items():
+            self.send_header(header, value)
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def graphql_server():
+    """A local stand-in GraphQL endpoint that records requests."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GraphQLHandler)
+    server.requests = []
+    server.responses = []
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/graphql"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class _TunnelHandler(BaseHTTPRequestHandler):
+    """A forward proxy that only answers CONNECT, like most HTTPS proxies."""
+
+    def do_CONNECT(self):
+        self.server.tunnels.append((self.path, self.headers.get("Proxy-Authorization")))
+        host, port = self.path.rsplit(":", 1)
+        upstream = socket.create_connection((host, int(port)))
+        self.send_response(200, "Connection established")
+        self.end_headers()
+        self.close_connection = True
+        peers = {self.connection: upstream, upstream: self.connection}
+        with upstream:
+            while True:
+                readable, _, _ = select.select(list(peers), [], [], 5)
+                chunks = [(sock, sock.recv(65536)) for sock in readable]
+                if not chunks or not all(data for _, data in chunks):
+                    return
+                for sock, data in chunks:
+                    peers[sock].sendall(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def tunnel_proxy():
+    """A local CONNECT proxy that records the tunnels it opens."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TunnelHandler)
+    server.daemon_threads = True
+    server.tunnels = []
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_native_post_success(graphql_server):
+    """POST sends the query, variables, token and gzip header."""
+    graphql_server.responses.append((200, {"data": {"ok": True}}))
+    transport = reviewers._NativeTransport("tok", graphql_server.url)
+    result = transport.post("query { ok }", {"owner": "o", "cursor": None})
+    assert result == {"data": {"ok": True}}
+    request = graphql_server.requests[0]
+    assert request["payload"] == {"query": "query { ok }", "variables": {"owner": "o"}}
+    assert request["headers"]["Authorization"] == "bearer tok"
+    assert "gzip" in request["headers"]["Accept-Encoding"]
+    transport.close()
+
+
+def test_native_post_observes_rate_limit_headers(graphql_server):
+    """X-RateLimit-* headers feed the shared state, even on errors."""
+    headers = {
+        "X-RateLimit-Limit": "5000",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": "4070908800",
+        "X-RateLimit-Resource": "graphql",
+    }
+    graphql_server.responses.append((403, {"message": "rate limited"}, headers))
+    transport = reviewers._NativeTransport("tok", graphql_server.url)
+    with pytest.raises(reviewers._TransportError):
+        transport.post("query { }")
+    assert reviewers._rate_limit.remaining == 0
+    assert reviewers._rate_limit.reset_at.year == 2099
+    transport.close()
+
+
+def test_native_post_reuses_connection(graphql_server):
+    """Sequential requests share one keep-alive connection."""
+    graphql_server.responses += [(200, {"data": {}})] * 3
+    transport = reviewers._NativeTransport("tok", graphql_server.url)
+    for _ in range(3):
+        transport.post("query { }")
+    peers = {r["peer"] for r in graphql_server.requests}
+    assert len(peers) == 1
+    transport.close()
+
+
+def test_native_post_no_variables_omitted(graphql_server):
+    graphql_server.responses.append((200, {"data": {}}))
+    transport = reviewers._NativeTransport("tok", graphql_server.url)
+    transport.post("query { }")
+    assert "variables" not in graphql_server.requests[0]["payload"]
+
+
+def test_native_post_http_error(graphql_server):
+    """Non-2xx responses raise _TransportError with an HTTP status message."""
+    graphql_server.responses.append((502, {"message": "Bad Gateway"}))
+    transport = reviewers._NativeTransport("tok", graphql_server.url)
+    with pytest.raises(reviewers._TransportError) as exc:
+        transport.post("query { }")
+    assert exc.value.message == "HTTP 502: Bad Gateway"
+    assert exc.value.source == f"POST {graphql_server.url}"
+
+
+def test_native_post_retry_after(graphql_server):
+    """A Retry-After header is surfaced on the _TransportError."""
+    graphql_server.responses.append(
+        (403, {"message": "secondary rate limit"}, {"Retry-After": "42"})
+    )
+    transport = reviewers._NativeTransport("tok", graphql_server.url)
+    with pytest.raises(reviewers._TransportError) as exc:
+        transport.post("query { }")
+    assert exc.value.retry_after == 42
+
+
+def test_native_post_http_error_non_json():
+    """Error bodies that are not JSON are used verbatim."""
+    transport = reviewers._NativeTransport("tok", "https://api.example.com/graphql")
+    resp = MagicMock(status=500, will_close=True)
+    resp.read.return_value = b"oops"
+    resp.getheader.return_value = ""
+    conn = MagicMock()
+    conn.getresponse.return_value = resp
+    with (
+        patch.object(transport, "_connect", return_value=conn),
+        pytest.raises(reviewers._TransportError, match="HTTP 500: oops"),
+    ):
+        transport.post("query { }")
+    conn.close.assert_called_once()
+
+
+def test_native_post_stale_connection_retried():
+    """A dropped keep-alive connection is retried on a fresh one."""
+    transport = reviewers._NativeTransport("tok", "https://api.example.com/graphql")
+    stale = MagicMock()
+    stale.request.side_effect = ConnectionResetError("reset")
+    transport._idle.append(stale)
+    resp = MagicMock(status=200, will_close=False)
+    resp.read.return_value = b'{"data": {"ok": true}}'
+    resp.getheader.return_value = ""
+    fresh = MagicMock()
+    fresh.getresponse.return_value = resp
+    with patch.object(transport, "_connect", return_value=fresh):
+        assert transport.post("query { }") == {"data": {"ok": True}}
+    stale.close.assert_called_once()
+    assert transport._idle == [fresh]
+
+
+def test_native_post_protocol_error_becomes_oserror():
+    """http.client protocol errors surface as ConnectionError (an OSError)."""
+    transport = reviewers._NativeTransport("tok", "https://api.example.com/graphql")
+    conn = MagicMock()
+    conn.getresponse.side_effect = reviewers.http.client.BadStatusLine("x")
+    with (
+        patch.object(transport, "_connect", return_value=conn),
+        pytest.raises(ConnectionError),
+    ):
+        transport.post("query { }")
+
+
+def test_native_post_socket_error_propagates():
+    transport = reviewers._NativeTransport("tok", "https://api.example.com/graphql")
+    conn = MagicMock()
+    conn.request.side_effect = TimeoutError("timed out")
+    with (
+        patch.object(transport, "_connect", return_value=conn),
+        pytest.raises(TimeoutError),
+    ):
+        transport.post("query { }")
+
+
+def test_native_pool_size_limit():
+    """Connections beyond the pool size are closed instead of kept."""
+    transport = reviewers._NativeTransport("tok", "https://x/graphql", pool_size=1)
+    first, second = MagicMock(), MagicMock()
+    transport._checkin(first)
+    transport._checkin(second)
+    assert transport._idle == [first]
+    second.close.assert_called_once()
+    transport.close()
+    first.close.assert_called_once()
+    assert transport._idle == []
+
+
+def test_native_connect_schemes():
+    https = reviewers._NativeTransport("tok", "https://api.github.com/graphql")
+    assert isinstance(https._connect(), reviewers.http.client.HTTPSConnection)
+    plain = reviewers._NativeTransport("tok", "http://127.0.0.1:1/graphql")
+    assert isinstance(plain._connect(), reviewers.http.client.HTTPConnection)
+
+
+def test_native_post_through_proxy(graphql_server, tunnel_proxy, monkeypatch):
+    """A proxy from the environment is tunnelled through with its credentials."""
+    graphql_server.responses += [(200, {"data": {"ok": True}})] * 2
+    proxy = tunnel_proxy.url.replace("://", "://me:p%40ss@")
+    monkeypatch.setenv("http_proxy", proxy)
+    transport = reviewers._NativeTransport("tok", graphql_server.url)
+    for _ in range(2):
+        assert transport.post("query { ok }") == {"data": {"ok": True}}
+    transport.close()
+    target = graphql_server.url.split("/")[2]
+    auth = "Basic " + base64.b64encode(b"me:p@ss").decode()
+    assert tunnel_proxy.tunnels == [(target, auth)]
+    assert graphql_server.requests[0]["headers"]["Authorization"] == "bearer tok"
+
+
+def test_proxy_for_environment(monkeypatch):
+    """HTTPS_PROXY applies unless NO_PROXY lists the host."""
+    url = "https://api.github.com/graphql"
+    assert reviewers._proxy_for(url) is None
+    monkeypatch.setenv("HTTPS_PROXY", "proxy.example.com:3128")
+    assert reviewers._proxy_for(url) == "http://proxy.example.com:3128"
+    assert reviewers._NativeTransport("tok", url)._connect()._tunnel_host == (
+        "api.github.com"
+    )
+    monkeypatch.setenv("NO_PROXY", "localhost,.github.com")
+    assert reviewers._proxy_for(url) is None
+
+
+def test_graphql_request_uses_native_transport(graphql_server):
+    """_graphql_request routes through the configured transport."""
+    graphql_server.responses.append((200, {"data": {"ok": True}}))
+    reviewers._transport = reviewers._NativeTransport("tok", graphql_server.url)
+    with patch("subprocess.run") as mock_run:
+        assert reviewers._graphql_request("query { }") == {"ok": True}
+    mock_run.assert_not_called()
+
+
+@patch("time.sleep")
+def test_graphql_request_native_server_error_retries(mock_sleep, graphql_server):
+    graphql_server.responses += [
+        (503, {"message": "Service Unavailable"}),
+        (200, {"data": {"ok": True}}),
+    ]
+    reviewers._transport = reviewers._NativeTransport("tok", graphql_server.url)
+    assert reviewers._graphql_request("query { }") == {"ok": True}
+    assert len(graphql_server.requests) == 2
+
+
+def test_graphql_request_native_error_message(graphql_server):
+    graphql_server.responses.append((401, {"message": "Bad credentials"}))
+    reviewers._transport = reviewers._NativeTransport("tok", graphql_server.url)
+    with pytest.raises(RuntimeError, match="graphql failed: HTTP 401: Bad credentials"):
+        reviewers._graphql_request("query { }")
+
+
+def test_graphql_request_native_partial_data(graphql_server):
+    """Partial data in an error body is still returned with allow_partial."""
+    graphql_server.responses.append(
+        (500, {"data": {"u_a": {"login": "a"}}, "errors": [{"message": "x"}]})
+    )
+    reviewers._transport = reviewers._NativeTransport("tok", graphql_server.url)
+    result = reviewers._graphql_request("query { }", allow_partial=True)
+    assert result == {"u_a": {"login": "a"}}
+
+
+# --- credential pool ---
+
+
+class _QuotaHandler(BaseHTTPRequestHandler):
+    """Answers with a separate hourly quota per bearer token."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers["Content-Length"]))
+        token = self.headers["Authorization"].split()[-1]
+        reset = int(time.time()) + 3600
+        headers = {"X-RateLimit-Reset": str(reset)}
+        if token in server.secondary:
+            server.secondary.discard(token)
+            status, body = 403, {"message": "You have exceeded a secondary rate limit"}
+            headers["Retry-After"] = "30"
+        elif server.quotas[token] <= 0:
+            status, body = 403, {"message": "API rate limit exceeded"}
+            headers["X-RateLimit-Remaining"] = "0"
+        else:
+            server.quotas[token] -= 1
+            server.served[token] += 1
+            remaining = server.quotas[token]
+            reset_at = datetime.fromtimestamp(reset, tz=timezone.utc)
+            status = 200
+            body = {
+                "data": {
+                    "rateLimit": {
+                        "cost": 1,
+                        "remaining": remaining,
+                        "resetAt": reset_at.isoformat().replace("+00:00", "Z"),
+                    },
+                    "ok": True,
+                }
+            }
+            headers["X-RateLimit-Remaining"] = str(remaining)
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def quota_server():
+    """A local stand-in GraphQL endpoint enforcing per-token quotas."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _QuotaHandler)
+    server.quotas = {}
+    server.secondary = set()
+    server.served = Counter()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/graphql"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _pool(server, **quotas):
+    server.quotas.update(quotas)
+    return reviewers._CredentialPool([(t, t) for t in quotas], server.url)
+
+
+def test_pool_prefers_most_headroom(quota_server):
+    """After one response each, requests go to the token with most quota."""
+    pool = _pool(quota_server, a=100, b=1000)
+    for _ in range(10):
+        pool.post("query { ok }")
+    assert quota_server.served == {"a": 1, "b": 9}
+    assert pool.summary() == "Requests per credential: a: 1, b: 9"
+    pool.close()
+
+
+def test_pool_reports_combined_quota(quota_server):
+    pool = _pool(quota_server, a=100, b=1000)
+    pool.post("query { ok }")
+    data = pool.post("query { ok }")
+    assert data["data"]["rateLimit"]["remaining"] == 99 + 999
+    assert data["data"]["rateLimit"]["cost"] == 1
+    reviewers._rate_limit.observe_response(data["data"]["rateLimit"])
+    assert reviewers._rate_limit.remaining == 1098
+
+
+def test_pool_skips_exhausted_token(quota_server):
+    """A token out of quota is passed over; the request moves on."""
+    pool = _pool(quota_server, a=0, b=10)
+    assert pool.post("query { ok }")["data"]["ok"] is True
+    pool.post("query { ok }")
+    assert quota_server.served == {"b": 2}
+    assert pool.members[0].rate_limit.remaining == 0
+
+
+def test_pool_all_exhausted_raises(quota_server):
+    """With no token left the quota error surfaces for the reset wait."""
+    pool = _pool(quota_server, a=0, b=0)
+    with pytest.raises(reviewers._TransportError, match="rate limit"):
+        pool.post("query { ok }")
+
+
+@patch("time.sleep")
+def test_pool_secondary_limit_sidelines_one_token(mock_sleep, quota_server):
+    """A secondary limit pauses only its token; nobody sleeps."""
+    quota_server.secondary.add("a")
+    pool = _pool(quota_server, a=1000, b=100)
+    for _ in range(3):
+        pool.post("query { ok }")
+    assert quota_server.served == {"b": 3}
+    assert pool.members[0].breaker.open_for() > 0
+    assert pool.members[1].breaker.open_for() == 0
+    mock_sleep.assert_not_called()
+
+
+def test_pool_waits_when_every_token_is_sidelined():
+    pool = reviewers._CredentialPool([("a", "x"), ("b", "y")], "http://x/graphql")
+    first, second = pool.members
+    first.breaker.trip(30)
+    second.breaker.trip(10)
+    with patch.object(second.breaker, "wait") as mock_wait:
+        mock_wait.side_effect = lambda: setattr(second.breaker, "_open_until", 0.0)
+        assert pool._checkout() is second
+    mock_wait.assert_called_once()
+
+
+def test_pool_retries_rate_limit_reported_in_errors():
+    """A 200 response whose errors report the quota moves to another token."""
+    pool = reviewers._CredentialPool([("a", "x"), ("b", "y")], "http://x/graphql")
+    first, second = pool.members
+    first.transport.post = MagicMock(
+        return_value={"errors": [{"message": "API rate limit exceeded"}]}
+    )
+    second.transport.post = MagicMock(return_value={"data": {"ok": True}})
+    assert pool.post("query { ok }") == {"data": {"ok": True}}
+    assert (first.sent, second.sent) == (0, 1)
+
+
+def test_pool_sideline_without_reset_time():
+    """An exhausted token with no known reset waits out the hour, not for ever."""
+    pool = reviewers._CredentialPool([("a", "x"), ("b", "y")], "http://x/graphql")
+    member = pool.members[0]
+    assert not pool._sideline(member, "HTTP 401: Bad credentials")
+    assert pool._sideline(member, "API rate limit exceeded")
+    remaining, reset_at = member.rate_limit.snapshot()
+    assert remaining == 0
+    later = reset_at - datetime.now(timezone.utc)
+    assert 3500 < later.total_seconds() <= 3600
+
+
+@patch("time.sleep")
+def test_graphql_request_through_pool(mock_sleep, quota_server):
+    """_graphql_request runs unchanged on top of a pool."""
+    reviewers._transport = _pool(quota_server, a=0, b=500)
+    assert reviewers._graphql_request("query { ok }")["ok"] is True
+
+
+# --- token and configuration ---
+
+
+def test_gh_auth_token_success():
+    mock_result = MagicMock(stdout="gho_abc\n")
+    with patch("subprocess.run", return_value=mock_result) as mock_run:
+        assert reviewers._gh_auth_token() == "gho_abc"
+    assert mock_run.call_args[0][0] == ["gh", "auth", "token"]
+
+
+def test_gh_auth_token_with_host(monkeypatch):
+    monkeypatch.setenv("GH_HOST", "ghe.example.com")
+    with patch("subprocess.run", return_value=MagicMock(stdout="t")) as mock_run:
+        reviewers._gh_auth_token()
+    assert mock_run.call_args[0][0][-2:] == ["--hostname", "ghe.example.com"]
+
+
+def test_gh_auth_token_failure():
+    with patch("subprocess.run", side_effect=subprocess.CalledProcessError(1, "gh")):
+        assert reviewers._gh_auth_token() is None
+
+
+def test_graphql_api_url(monkeypatch):
+    monkeypatch.delenv("GH_HOST", raising=False)
+    assert reviewers._graphql_api_url() == "https://api.github.com/graphql"
+    monkeypatch.setenv("GH_HOST", "ghe.example.com")
+    assert reviewers._graphql_api_url() == "https://ghe.example.com/api/graphql"
+
+
+def test_configure_transport_auto_native():
+    with patch.object(reviewers, "_gh_auth_token", return_value="tok"):
+        assert reviewers.configure_transport("auto") == "native"
+    assert isinstance(reviewers._transport, reviewers._NativeTransport)
+
+
+def test_configure_transport_timeout():
+    with patch.object(reviewers, "_gh_auth_token", return_value="tok"):
+        reviewers.configure_transport("auto", timeout=7)
+    assert reviewers._transport._timeout == 7
+    assert reviewers._request_timeout == 7
+
+
+def test_configure_transport_auto_falls_back():
+    with patch.object(reviewers, "_gh_auth_token", return_value=None):
+        assert reviewers.configure_transport("auto") == "gh"
+    assert reviewers._transport is None
+
+
+def test_configure_transport_gh_closes_existing():
+    existing = MagicMock()
+    reviewers._transport = existing
+    assert reviewers.configure_transport("gh") == "gh"
+    existing.close.assert_called_once()
+    assert reviewers._transport is None
+
+
+def test_configure_transport_native_requires_token():
+    with (
+        patch.object(reviewers, "_gh_auth_token", return_value=None),
+        pytest.raises(RuntimeError, match="gh auth token"),
+    ):
+        reviewers.configure_transport("native")
+
+
+def test_gh_auth_token_for_user():
+    with patch("subprocess.run", return_value=MagicMock(stdout="t")) as mock_run:
+        reviewers._gh_auth_token("alice")
+    assert mock_run.call_args[0][0][-2:] == ["--user", "alice"]
+
+
+def test_credential_token_specs(monkeypatch):
+    monkeypatch.setenv("APP_TOKEN", "ghs_app")
+    assert reviewers._credential_token("env:APP_TOKEN") == "ghs_app"
+    with patch.object(reviewers, "_gh_auth_token", return_value="t") as mock_gh:
+        assert reviewers._credential_token("gh:alice") == "t"
+        assert reviewers._credential_token("gh") == "t"
+    assert [c.args for c in mock_gh.call_args_list] == [("alice",), (None,)]
+    with pytest.raises(RuntimeError, match="Unknown credential"):
+        reviewers._credential_token("file:/tmp/x")
+    monkeypatch.delenv("APP_TOKEN")
+    with pytest.raises(RuntimeError, match="No token"):
+        reviewers._credential_token("env:APP_TOKEN")
+
+
+def test_configure_transport_credentials(monkeypatch):
+    monkeypatch.setenv("T1", "one")
+    monkeypatch.setenv("T2", "two")
+    assert reviewers.configure_transport("auto", credentials=["env:T1"]) == "native"
+    assert isinstance(reviewers._transport, reviewers._NativeTransport)
+    reviewers.configure_transport("auto", credentials=["env:T1", "env:T2"])
+    pool = reviewers._transport
+    assert isinstance(pool, reviewers._CredentialPool)
+    assert [m.name for m in pool.members] == ["env:T1", "env:T2"]
+    assert pool.members[0].rate_limit is not pool.members[1].rate_limit
+    with pytest.raises(RuntimeError, match="native"):
+        reviewers.configure_transport("gh", credentials=["env:T1"])
+
+
+def test_main_exits_when_native_unavailable(tmp_path):
+    with (
+        patch.object(reviewers, "_gh_auth_token", return_value=None),
+        pytest.raises(SystemExit, match="Native transport"),
+    ):
+        reviewers.main(["--output", str(tmp_path), "--transport", "native", "o/r"])